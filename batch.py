@@ -0,0 +1,147 @@
+""" Runs many headless games across a pool of processes and aggregates their
+    outcomes.  Every combination of the scenario parameters given is played
+    --runs times, each run with its own seed.  Run from the repository root so
+    the relative resource paths resolve:
+
+        python batch.py --runs 1000 --survivors 10 20 --output runs.jsonl
+"""
+
+import argparse
+import json
+from itertools import product
+from multiprocessing import Pool, cpu_count
+from statistics import mean, median
+
+from entities.graveyard.entity import Graveyard
+from headless import DEFAULT_TIME_STEP, init_headless_display
+from resources.resourcemgr import ResourceMgr
+from scenes.game_scene import GameScene
+
+# The scenario parameters that can be varied between runs.
+SCENARIO_PARAMETERS = ("graveyards", "spawn_rate", "supply", "survivors", "supplycrates")
+
+# Each worker process loads its own resources once, in init_worker.
+resource_mgr = None
+
+
+def init_worker():
+    global resource_mgr
+    init_headless_display()
+    resource_mgr = ResourceMgr()
+
+
+def run_game(run):
+    """ Plays one game to full infection or until max_game_time seconds of
+        game time have passed, and returns a summary of how it went. """
+    scene = GameScene(resource_mgr, seed=run["seed"])
+    scene.generate_game(**{name: run[name] for name in SCENARIO_PARAMETERS})
+    game = scene.game
+
+    survivors_start = game.get_entity_count("survivor")
+    supplycrates_start = game.get_entity_count("supplycrate")
+    peak_zombies = game.get_entity_count("zombie")
+    infected_at = None
+
+    ticks = 0
+    while game.time < run["max_game_time"]:
+        scene.tick(run["time_step"])
+        ticks += 1
+
+        peak_zombies = max(peak_zombies, game.get_entity_count("zombie"))
+        if survivors_start and not game.get_entity_count("survivor"):
+            infected_at = game.time
+            break
+
+    survivors_left = game.get_entity_count("survivor")
+    return dict(
+        run,
+        ticks=ticks,
+        game_time=game.time,
+        infected_at=infected_at,
+        survivors_left=survivors_left,
+        survival_rate=survivors_left / survivors_start if survivors_start else None,
+        supplycrates_used=supplycrates_start - game.get_entity_count("supplycrate"),
+        supply_left=game.supply,
+        zombies_left=game.get_entity_count("zombie"),
+        peak_zombies=peak_zombies,
+    )
+
+
+def describe(values):
+    """ Summary statistics of a list of numbers, or None if it is empty. """
+    if not values:
+        return None
+    return {"mean": mean(values), "median": median(values), "min": min(values), "max": max(values)}
+
+
+def aggregate(summaries):
+    """ Combines the summaries of the runs of one scenario. """
+    infection_times = [summary["infected_at"] for summary in summaries if summary["infected_at"] is not None]
+    survival_rates = [summary["survival_rate"] for summary in summaries if summary["survival_rate"] is not None]
+    return {
+        "runs": len(summaries),
+        "fully_infected": len(infection_times) / len(summaries),
+        "time_to_full_infection": describe(infection_times),
+        "survival_rate": describe(survival_rates),
+        "supplycrates_used": describe([summary["supplycrates_used"] for summary in summaries]),
+        "supply_left": describe([summary["supply_left"] for summary in summaries]),
+        "peak_zombies": describe([summary["peak_zombies"] for summary in summaries]),
+    }
+
+
+def build_runs(args):
+    """ One run per seed for every combination of the scenario parameters. """
+    runs = []
+    seed = args.seed
+    for values in product(*(getattr(args, name) for name in SCENARIO_PARAMETERS)):
+        for _ in range(args.runs):
+            run = dict(zip(SCENARIO_PARAMETERS, values))
+            run.update(seed=seed, max_game_time=args.max_game_time, time_step=args.time_step)
+            runs.append(run)
+            seed += 1
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Outbreak Z batch runner")
+    parser.add_argument("--runs", type=int, default=100, help="runs of every scenario")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first run, the others count up from it")
+    parser.add_argument("--processes", type=int, default=cpu_count(), help="worker processes")
+    parser.add_argument("--graveyards", type=int, nargs="+", default=[4])
+    parser.add_argument("--spawn-rate", type=float, nargs="+", default=[Graveyard.SPAWN_RATE],
+                        help="seconds between zombies at each graveyard")
+    parser.add_argument("--supply", type=float, nargs="+", default=[20])
+    parser.add_argument("--survivors", type=int, nargs="+", default=[10])
+    parser.add_argument("--supplycrates", type=int, nargs="+", default=[10])
+    parser.add_argument("--max-game-time", type=float, default=300.,
+                        help="seconds of game time after which a run stops")
+    parser.add_argument("--time-step", type=float, default=DEFAULT_TIME_STEP,
+                        help="simulated milliseconds per tick")
+    parser.add_argument("--output", help="JSON lines file receiving each run's summary as it finishes")
+    args = parser.parse_args()
+
+    runs = build_runs(args)
+    summaries = {}  # scenario -> [run summary]
+
+    output = open(args.output, "w") if args.output else None
+    try:
+        with Pool(args.processes, initializer=init_worker) as pool:
+            for done, summary in enumerate(pool.imap_unordered(run_game, runs), 1):
+                scenario = tuple(summary[name] for name in SCENARIO_PARAMETERS)
+                summaries.setdefault(scenario, []).append(summary)
+                if output is not None:
+                    output.write(json.dumps(summary) + "\n")
+                    output.flush()
+                print(f"\r{done}/{len(runs)} runs", end="", flush=True)
+        print()
+    finally:
+        if output is not None:
+            output.close()
+
+    report = [dict(zip(SCENARIO_PARAMETERS, scenario), **aggregate(scenario_summaries))
+              for scenario, scenario_summaries in sorted(summaries.items())]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+""" Scenario benchmarks for outbreak_z.
+
+    Builds worlds of increasing size through Game.add_entity and measures the
+    per-tick wall time spent in each phase of the simulation.  Run from the
+    repository root so the relative resource paths resolve:
+
+        python -m benchmarks.scenarios --sizes 100 1000 --output bench.json
+"""
+
+import argparse
+import json
+import platform
+from contextlib import contextmanager
+from statistics import mean, median
+from time import perf_counter, strftime
+
+import pygame
+from pygame.math import Vector2
+
+from headless import DEFAULT_TIME_STEP, init_headless_display
+from game import Game
+from resources.resourcemgr import ResourceMgr
+from scenes.game_scene import GameScene
+from entities.base_entity import StateMachine
+from entities.supplycrate.entity import SupplyCrate
+from entities.survivor.entity import Survivor
+from entities.zombie.entity import Zombie
+
+DEFAULT_SIZES = [100, 1000, 5000, 10000]
+PHASES = ["brain", "collision", "movement", "draw"]
+
+SURVIVORS_PER_ZOMBIE = 1 / 10
+CRATES_PER_ZOMBIE = 1 / 20
+
+
+class PhaseTimer(object):
+    """ Accumulates wall time per phase for the tick currently being measured. """
+
+    def __init__(self):
+        self.current = dict.fromkeys(PHASES, 0.)
+
+    def wrap(self, phase, func):
+        """ Returns func wrapped so that its run time is added to phase. """
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.current[phase] += perf_counter() - start
+        return timed
+
+    def reset(self):
+        self.current = dict.fromkeys(PHASES, 0.)
+
+
+@contextmanager
+def instrumented(timer):
+    """ Temporarily wraps the per-entity hot paths with the timer. """
+    originals = [
+        (StateMachine, "think", "brain"),
+        (Game, "_collide_entities", "collision"),
+        (Game, "_move_entities", "movement"),
+    ]
+    saved = [(owner, attr, getattr(owner, attr)) for owner, attr, _ in originals]
+    try:
+        for owner, attr, phase in originals:
+            setattr(owner, attr, timer.wrap(phase, getattr(owner, attr)))
+        yield
+    finally:
+        for owner, attr, func in saved:
+            setattr(owner, attr, func)
+
+
+def build_scenario(resource_mgr, zombies, seed=0):
+    """ Creates a GameScene populated with the zombies plus a proportional
+        number of survivors and supply crates at random locations.  The game
+        is seeded too, so the same seed always plays out the same way. """
+    scene = GameScene(resource_mgr, seed=seed)
+    game = scene.game
+    rng = game.random
+
+    def random_location():
+        return Vector2(rng.uniform(0, scene.viewport_rect.right), rng.uniform(0, scene.viewport_rect.bottom))
+
+    for _ in range(zombies):
+        zombie = Zombie(game, resource_mgr)
+        zombie.location = random_location()
+        zombie.brain.set_state("wandering")
+        game.add_entity(zombie)
+
+    for _ in range(max(1, int(zombies * SURVIVORS_PER_ZOMBIE))):
+        survivor = Survivor(game, resource_mgr)
+        survivor.location = random_location()
+        survivor.brain.set_state("exploring")
+        game.add_entity(survivor)
+
+    for _ in range(max(1, int(zombies * CRATES_PER_ZOMBIE))):
+        supplycrate = SupplyCrate(game, resource_mgr)
+        supplycrate.location = random_location()
+        game.add_entity(supplycrate)
+
+    return scene
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples):
+    """ Summary statistics in milliseconds for a list of times in seconds. """
+    return {
+        "mean_ms": mean(samples) * 1000,
+        "median_ms": median(samples) * 1000,
+        "p95_ms": percentile(samples, .95) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def run_scenario(resource_mgr, surface, zombies, ticks, max_seconds, seed=0):
+    """ Ticks and draws the scenario, recording each phase per tick.  Stops
+        early once max_seconds of wall time have been spent. """
+    scene = build_scenario(resource_mgr, zombies, seed)
+    entity_count = len(scene.game.entities)
+
+    timer = PhaseTimer()
+    phase_samples = {phase: [] for phase in PHASES}
+    tick_samples = []
+
+    started = perf_counter()
+    with instrumented(timer):
+        for _ in range(ticks):
+            timer.reset()
+
+            tick_start = perf_counter()
+            scene.tick(DEFAULT_TIME_STEP)
+            draw_start = perf_counter()
+            scene.draw(surface)
+            tick_end = perf_counter()
+
+            timer.current["draw"] = tick_end - draw_start
+            tick_samples.append(tick_end - tick_start)
+            for phase in PHASES:
+                phase_samples[phase].append(timer.current[phase])
+
+            if tick_end - started > max_seconds:
+                break
+
+    return {
+        "zombies": zombies,
+        "entities": entity_count,
+        "ticks": len(tick_samples),
+        "tick": summarize(tick_samples),
+        "phases": {phase: summarize(samples) for phase, samples in phase_samples.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Outbreak Z scenario benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="zombie counts to benchmark")
+    parser.add_argument("--ticks", type=int, default=100, help="ticks to measure per scenario")
+    parser.add_argument("--max-seconds", type=float, default=60.,
+                        help="wall time budget per scenario")
+    parser.add_argument("--seed", type=int, default=0, help="seed for entity placement and the game")
+    parser.add_argument("--output", default="bench_output.json", help="JSON results file")
+    args = parser.parse_args()
+
+    init_headless_display()
+    surface = pygame.Surface((1280, 800))
+    resource_mgr = ResourceMgr()
+
+    results = []
+    for zombies in args.sizes:
+        result = run_scenario(resource_mgr, surface, zombies, args.ticks, args.max_seconds, args.seed)
+        results.append(result)
+
+        phases = "  ".join(f"{phase} {result['phases'][phase]['mean_ms']:.2f}" for phase in PHASES)
+        print(f"{zombies:>6} zombies: tick {result['tick']['mean_ms']:.2f} ms ({phases}) over {result['ticks']} ticks")
+
+    report = {
+        "timestamp": strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "time_step_ms": DEFAULT_TIME_STEP,
+        "seed": args.seed,
+        "scenarios": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,23 @@
     game_base contains base and misc classes used by outbreak-z.
 """
 
-from random import randint
 from uuid import uuid1 as uuid
 
+from pygame import Rect
 from pygame.math import Vector2
 
+# Draw layers, lower layers are drawn first.
+LAYER_GROUND = 0  # decals on the ground
+LAYER_PROPS = 1  # crates and other fixtures
+LAYER_ACTORS = 2  # survivors and zombies
+LAYER_PROJECTILES = 3  # bullets
+
 
 class GameEntity(object):
     """ The base object for any entity that will exist inside the game
         game.  This class handles the drawing and processing each tick. """
+    COLLISION_DISTANCE = 10  # meters, closer than this and entities spread out
+    LAYER = LAYER_ACTORS
 
     def __init__(self, game, name, image, resource_mgr):
         self.debug_mode = False
@@ -19,94 +27,174 @@ class GameEntity(object):
         self.name = name
         self.image = image
         self.resource_mgr = resource_mgr
-        self.location = Vector2(0, 0)  # location always in "viewport" coordinates
-        self.destination = Vector2(0, 0)  # destination always in "viewport" coordinates
+
+        # While the entity is in the game its location, destination and speed
+        # live in the game's Kinematics arrays; until then they are kept here.
+        self.slot = None  # Will be set by the Game
+        self._location = Vector2(0, 0)
+        self._destination = Vector2(0, 0)
+        self._speed = 0.
+
         self.size = 1  # meters wide and tall
-        self.speed = 0.  # meters/second
 
-        self.brain = StateMachine()
+        self.brain = StateMachine(self)
+        self.think_interval = 1  # ticks between thinks, see ThinkScheduler
 
         self.id = None  # Will be set by the Game
 
         self.prev_destination = None
         self.redirect_timer = None
 
+        # What the entity looked like when last drawn, for dirty rect rendering.
+        self.screen_rect = None
+        self.screen_image = None
+
+    def reset(self):
+        """ Puts a removed entity back into the state it was constructed in,
+            so that pooled entities can be handed out again. """
+        self.debug_mode = False
+        self.think_interval = 1
+        self.id = None
+        self._location = Vector2(0, 0)
+        self._destination = Vector2(0, 0)
+        self._speed = 0.
+        self.brain.active_state = None
+        self.prev_destination = None
+        if self.redirect_timer is not None:
+            self.redirect_timer.cancel()
+        self.redirect_timer = None
+        self.screen_rect = None
+        self.screen_image = None
+
     def __str__(self):
         return self.name + ':' + str(self.id) + ' - ' + self.brain.active_state.name
 
-    def draw(self, surface):
-        # Convert the "viewport" coordinates into "Device" coordinates for drawing
-        dev_location = self.game.scene.get_dev_vec_from_viewport_vec(self.location)
+    @property
+    def location(self) -> Vector2:
+        """ Location always in "viewport" coordinates.  This is a copy, assign
+            a new vector to move the entity. """
+        if self.slot is None:
+            return Vector2(self._location)
+        locations = self.game.kinematics.locations
+        return Vector2(locations.item(self.slot, 0), locations.item(self.slot, 1))
+
+    @location.setter
+    def location(self, location: Vector2):
+        if self.slot is None:
+            self._location = Vector2(location)
+        else:
+            self.game.kinematics.locations[self.slot] = (location[0], location[1])
+            self.game.entity_moved(self)
+
+    @property
+    def destination(self) -> Vector2:
+        """ Destination always in "viewport" coordinates.  This is a copy, assign
+            a new vector to redirect the entity. """
+        if self.slot is None:
+            return Vector2(self._destination)
+        destinations = self.game.kinematics.destinations
+        return Vector2(destinations.item(self.slot, 0), destinations.item(self.slot, 1))
+
+    @destination.setter
+    def destination(self, destination: Vector2):
+        if self.slot is None:
+            self._destination = Vector2(destination)
+        else:
+            self.game.kinematics.destinations[self.slot] = (destination[0], destination[1])
+
+    @property
+    def speed(self) -> float:
+        """ Speed in meters/second """
+        if self.slot is None:
+            return self._speed
+        return self.game.kinematics.speeds.item(self.slot)
+
+    @speed.setter
+    def speed(self, speed: float):
+        if self.slot is None:
+            self._speed = speed
+        else:
+            self.game.kinematics.speeds[self.slot] = speed
+
+    def get_draw_location(self) -> Vector2:
+        """ Where the entity is drawn: between its location at the previous
+            and the current simulation step, as set by game.interpolation. """
+        alpha = self.game.interpolation
+        if self.slot is None or alpha >= 1.:
+            return self.location
+        previous = self.game.kinematics.previous_locations
+        previous_location = Vector2(previous.item(self.slot, 0), previous.item(self.slot, 1))
+        return previous_location.lerp(self.location, alpha)
+
+    def get_sprite_rect(self) -> Rect:
+        """ The device rect the entity's image covers. """
+        dev_location = self.game.scene.get_dev_vec_from_viewport_vec(self.get_draw_location())
 
         width, height = self.image.get_size()
-        surface.blit(self.image, (dev_location.x - width / 2, dev_location.y - height / 2))
+        return Rect(dev_location.x - width / 2, dev_location.y - height / 2, width, height)
+
+    def get_screen_rect(self) -> Rect:
+        """ The device rect the entity covers when drawn, debug drawing aside. """
+        return self.get_sprite_rect()
+
+    def needs_redraw(self):
+        """ True if the entity would look different from when it was last drawn. """
+        return self.image is not self.screen_image or self.get_screen_rect() != self.screen_rect
+
+    def draw(self, surface):
+        """ Draws the entity on its own.  The Game draws its entities in
+            batches instead, blitting their images then calling draw_overlays. """
+        sprite_rect = self.get_sprite_rect()
+        surface.blit(self.image, sprite_rect)
+        self.draw_overlays(surface, sprite_rect)
+
+    def draw_overlays(self, surface, sprite_rect):
+        """ Called once the entity's image has been drawn at sprite_rect.
+            Records what was drawn, then draws anything that goes on top of
+            the image. """
+        # Remember what was drawn so the previous and current rects are known.
+        self.screen_rect = sprite_rect
+        self.screen_image = self.image
 
         if self.debug_mode:
             if self.brain is not None and self.brain.active_state is not None:
                 debug_letter = self.brain.active_state.name[:2]
                 if len(debug_letter) == 2:
-                    surface.blit(self.resource_mgr.font.render(debug_letter, True, (0, 0, 0)), dev_location)
+                    # Convert the "viewport" coordinates into "Device" coordinates for drawing
+                    dev_location = self.game.scene.get_dev_vec_from_viewport_vec(self.location)
+                    surface.blit(self.resource_mgr.render_text(debug_letter), dev_location)
 
     def tick(self, time_passed):
-        """ Triggers the entities StateMachine and locomotion """
+        """ Triggers the entities StateMachine.  Collision avoidance and
+            locomotion are done for all entities at once by the Game. """
         self.brain.think()
 
-        if self.speed > 0 and self.location != self.destination:
-            self._check_collisions_(time_passed)
-            self._move_(time_passed)
-
     def get_random_destination(self):
         """ Returns a random vector within the viewport """
-        return Vector2(randint(0, self.game.scene.viewport_rect.right), randint(0, self.game.scene.viewport_rect.bottom))
-
-    def _check_collisions_(self, time_passed):
-        """ Checks to see if the entities current location is too close
-            to another entity, if so then the entity will attempt to spread out a bit."""
-        if self.redirect_timer is None:
-            # Check to make sure the entity isn't too close to another.
-            collision_distance = 10
-            blocking_entity = self.game.get_close_entity(None, self.location, collision_distance, self.id)
-
-            if blocking_entity is not None:
-                if self.debug_mode:
-                    print(f"{self.name}-{self.id}: Too close to {blocking_entity.name}-{blocking_entity.id}, avoiding!")
-                
-                self.prev_destination = self.destination
-                self.destination = self.get_random_destination()
-                self.redirect_timer = .2  # 200 ms
-        else:
-            if self.redirect_timer > 0:
-                # Currently redirecting, decrement timer by time passed
-                if self.debug_mode:
-                    print(f"{self.name}-{self.id}: Still avoiding for {self.redirect_timer}!")
-
-                self.redirect_timer -= time_passed
-            else:
-                # redirecting time expired, reset destination
-                if self.debug_mode:
-                    print(f"{self.name}-{self.id}: Completed avoidance.")
-                    
-                self.destination = self.prev_destination
-                self.prev_destination = None
-                self.redirect_timer = None
-
-    def _move_(self, time_passed):
-        """ Provides locomotion for the entity while ensuring it stays within the viewport. """
-        vec_to_destination = self.destination - self.location
-        distance_to_destination = vec_to_destination.length()
-        heading = vec_to_destination.normalize()
-        travel_distance = min(distance_to_destination, time_passed * self.speed)
-        self.location = self.location + travel_distance * heading
-
-        # Ensure the entity stays within the boundaries:
-        if self.location.x < 0:
-            self.location.x = 0
-        if self.location.x > self.game.scene.viewport_rect.right:
-            self.location.x = self.game.scene.viewport_rect.right
-        if self.location.y < 0:
-            self.location.y = 0
-        if self.location.y > self.game.scene.viewport_rect.bottom:
-            self.location.y = self.game.scene.viewport_rect.bottom
+        random = self.game.random
+        return Vector2(random.randint(0, self.game.scene.viewport_rect.right), random.randint(0, self.game.scene.viewport_rect.bottom))
+
+    def _check_collisions_(self, time_passed, blocking_entity):
+        """ Called by the Game for each moving entity, with another entity that
+            is too close to its current location (or None).  If there is one
+            then the entity will attempt to spread out a bit."""
+        if self.redirect_timer is None and blocking_entity is not None:
+            if self.debug_mode:
+                print(f"{self.name}-{self.id}: Too close to {blocking_entity.name}-{blocking_entity.id}, avoiding!")
+
+            self.prev_destination = self.destination
+            self.destination = self.get_random_destination()
+            self.redirect_timer = self.game.schedule(.2, self._end_redirect)  # 200 ms
+
+    def _end_redirect(self):
+        """ Called when the redirect_timer fires: redirecting time expired,
+            reset destination. """
+        if self.debug_mode:
+            print(f"{self.name}-{self.id}: Completed avoidance.")
+
+        self.destination = self.prev_destination
+        self.prev_destination = None
+        self.redirect_timer = None
 
 
 class State(object):
@@ -140,7 +228,8 @@ class StateMachine(object):
     """ As the brains of each GameEntity, the StateMachine manages the
         States provided to it and their execution. """
 
-    def __init__(self):
+    def __init__(self, entity=None):
+        self.entity = entity  # The GameEntity this is the brain of, if any
         self.states = {}  # Stores the states
         self.active_state = None  # The currently active state
 
@@ -166,4 +255,9 @@ class StateMachine(object):
             self.active_state.exit_actions()
 
         self.active_state = self.states[new_state_name]
+
+        # Let the game keep its index of entities by state up to date.
+        if self.entity is not None:
+            self.entity.game.state_changed(self.entity)
+
         self.active_state.entry_actions()
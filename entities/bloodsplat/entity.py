@@ -1,26 +1,39 @@
-from random import randint
-
-import pygame
-
-from entities.base_entity import GameEntity
+from entities.base_entity import GameEntity, LAYER_GROUND
 import entities.bloodsplat.states as states
 
 
 class BloodSplat(GameEntity):
     """ When Bullet meets Zombie, splat! """
     SIZE = 1  # meters wide and tall
+    LAYER = LAYER_GROUND
+    IMAGE_PATH = 'entities/bloodsplat/blood_splat.png'
+    FADE_TIME = 8.5  # seconds from fully opaque to gone
 
     def __init__(self, game, resource_mgr):
-        self.blood_splat_image = pygame.image.load('entities/bloodsplat/blood_splat.png').convert_alpha()
-
         # Set random image rotation.
-        rotate = pygame.transform.rotate
-        rotation = randint(1, 360)
-        GameEntity.__init__(self, game, "bloodsplat", rotate(self.blood_splat_image, rotation), resource_mgr)
+        self.rotation = game.random.randint(1, 360)
+        self.alpha = 255
+
+        GameEntity.__init__(self, game, "bloodsplat", self._get_image(resource_mgr), resource_mgr)
 
         self.size = BloodSplat.SIZE
 
         # Create an instance of each of the states
         fading_state = states.BloodStateFading(self)
         # Add the states to the state machine
-        self.brain.add_state(fading_state)
\ No newline at end of file
+        self.brain.add_state(fading_state)
+
+    def reset(self):
+        """ Resets the splat for reuse, with a fresh random rotation. """
+        GameEntity.reset(self)
+        self.rotation = self.game.random.randint(1, 360)
+        self.set_alpha(255)
+
+    def set_alpha(self, alpha):
+        """ Fades the splat.  The rotated and faded images are shared between
+            all splats, so the image is swapped rather than modified. """
+        self.alpha = alpha
+        self.image = self._get_image(self.resource_mgr)
+
+    def _get_image(self, resource_mgr):
+        return resource_mgr.get_transformed_image(BloodSplat.IMAGE_PATH, self.rotation, self.alpha)
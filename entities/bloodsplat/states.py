@@ -1,8 +1,5 @@
-from random import randint
-
-import pygame
-
 from entities.base_entity import State
+from resources.resourcemgr import ALPHA_STEP
 
 
 class BloodStateFading(State):
@@ -14,14 +11,27 @@ class BloodStateFading(State):
         # Set the survivor that this State will manipulate
         self.blood = blood
 
-    def do_actions(self):
-        alpha = self.blood.image.get_alpha()
-        self.blood.image.set_alpha(alpha - 1)
+        self.fade_started = None  # game time
+        self.fade_timer = None
 
-    def check_conditions(self):
-        alpha = self.blood.image.get_alpha()
-        if alpha <= 0:
+    def fade(self):
+        """ Lowers the alpha by as much as the faded images differ, or removes
+            the splat once it has faded away. """
+        faded = (self.blood.game.time - self.fade_started) / self.blood.FADE_TIME
+        if faded >= 1:
+            self.fade_timer = None
             self.blood.game.remove_entity(self.blood)
+            return
+
+        self.blood.set_alpha(int(255 * (1 - faded)))
+        self.fade_timer = self.blood.game.schedule(self.blood.FADE_TIME * ALPHA_STEP / 255, self.fade)
 
     def entry_actions(self):
-        self.blood.image.set_alpha(255)
+        self.blood.set_alpha(255)
+        self.fade_started = self.blood.game.time
+        self.fade_timer = self.blood.game.schedule(self.blood.FADE_TIME * ALPHA_STEP / 255, self.fade)
+
+    def exit_actions(self):
+        if self.fade_timer is not None:
+            self.fade_timer.cancel()
+            self.fade_timer = None
@@ -1,16 +1,14 @@
 from entities.base_entity import State
-from entities.bloodsplat.entity import BloodSplat
 
 
 class BulletStateSeeking(State):
     """ Controls the seeking of the Bullet towards its target """
 
-    def __init__(self, bullet, resource_mgr):
+    def __init__(self, bullet):
         # Call the base class constructor to init the State
         State.__init__(self, "seeking")
         # Set the survivor that this State will manipulate
         self.bullet = bullet
-        self.resource_mgr = resource_mgr
         self.zombie_id = None
 
     def do_actions(self):
@@ -22,7 +20,7 @@ class BulletStateSeeking(State):
                 if zombie.health <= 0:
                     self.bullet.game.remove_entity(zombie)
 
-                    blood = BloodSplat(self.bullet.game, self.resource_mgr)
+                    blood = self.bullet.game.pools["bloodsplat"].acquire()
                     blood.brain.set_state("fading")
                     blood.location = zombie.location
                     self.bullet.game.add_entity(blood)
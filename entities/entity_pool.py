@@ -0,0 +1,30 @@
+"""
+    entity_pool contains the EntityPool used to recycle short-lived entities.
+"""
+
+
+class EntityPool(object):
+    """ Keeps removed entities of one type so they can be reset and handed out
+        again, instead of building a new entity (and its StateMachine and
+        States) every time one is needed. """
+
+    def __init__(self, entity_type, game, resource_mgr, max_size=256):
+        self.entity_type = entity_type
+        self.game = game
+        self.resource_mgr = resource_mgr
+        self.max_size = max_size  # Released entities beyond this are dropped
+
+        self.free_entities = []
+
+    def acquire(self):
+        """ Returns a reset entity, reusing a released one when available. """
+        if self.free_entities:
+            entity = self.free_entities.pop()
+            entity.reset()
+            return entity
+        return self.entity_type(self.game, self.resource_mgr)
+
+    def release(self, entity):
+        """ Takes back an entity that has been removed from the game. """
+        if len(self.free_entities) < self.max_size:
+            self.free_entities.append(entity)
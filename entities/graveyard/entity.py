@@ -1,22 +1,23 @@
-import pygame
-
-from entities.base_entity import GameEntity
+from entities.base_entity import GameEntity, LAYER_PROPS
 from entities.graveyard.states import GraveyardStateSpawning
 
 
 class Graveyard(GameEntity):
     """ The graveyard is a zombie spawn point. """
     SIZE = 10  # meters wide and tall
+    SPAWN_RATE = 10  # seconds between zombies
+    LAYER = LAYER_PROPS
 
     def __init__(self, game, resource_mgr):
-        self.graveyard_image = pygame.image.load('entities/graveyard/graveyard.png').convert_alpha()
+        self.graveyard_image = resource_mgr.get_image('entities/graveyard/graveyard.png')
 
         GameEntity.__init__(self, game, 'graveyard', self.graveyard_image, resource_mgr)
 
         self.size = Graveyard.SIZE
+        self.spawn_rate = Graveyard.SPAWN_RATE
 
         # Create an instance of state
-        spawning_state = GraveyardStateSpawning(self, 10, resource_mgr)
+        spawning_state = GraveyardStateSpawning(self, resource_mgr)
 
         # Add the states to the state machine
         self.brain.add_state(spawning_state)
@@ -1,36 +1,36 @@
-from time import time
-
 from entities.base_entity import State
 from entities.zombie.entity import Zombie
 
 
 class GraveyardStateSpawning(State):
-    def __init__(self, graveyard, spawn_rate, resource_mgr):
+    def __init__(self, graveyard, resource_mgr):
         # Call the base class constructor to init the State
         State.__init__(self, "spawning")
 
         # Set the entity that this State will manipulate
         self.graveyard = graveyard
 
-        self.spawn_rate = spawn_rate
         self.resource_mgr = resource_mgr
-        self.next_spawn = None
+        self.spawn_timer = None
 
-    def do_actions(self):
-        if time() > self.next_spawn:
-            zombie = Zombie(self.graveyard.game, self.resource_mgr)
-            zombie.location = self.graveyard.location
-            zombie.brain.set_state("wandering")
+    def spawn(self):
+        """ Spawns a zombie, then schedules the next one. """
+        zombie = Zombie(self.graveyard.game, self.resource_mgr)
+        zombie.location = self.graveyard.location
+        zombie.brain.set_state("wandering")
+
+        self.graveyard.game.add_entity(zombie)
 
-            self.graveyard.game.add_entity(zombie)
+        self.spawn_timer = self.graveyard.game.schedule(self.graveyard.spawn_rate, self.spawn)
 
-            self.next_spawn = time() + self.spawn_rate
+    def do_actions(self):
+        pass
 
     def check_conditions(self):
         pass
 
     def entry_actions(self):
-        self.next_spawn = time()
+        self.spawn_timer = self.graveyard.game.schedule(0, self.spawn)
 
     def exit_actions(self):
-        pass
\ No newline at end of file
+        self.spawn_timer.cancel()
\ No newline at end of file
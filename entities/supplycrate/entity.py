@@ -1,16 +1,15 @@
-import pygame
-
-from entities.base_entity import GameEntity
+from entities.base_entity import GameEntity, LAYER_PROPS
 
 
 class SupplyCrate(GameEntity):
     SIZE = 1  # meters wide and tall
+    LAYER = LAYER_PROPS
     SUPPLY_COST = 1
 
     """ Simple supply entity """
     def __init__(self, game, resource_mgr):
         
-        self.supplycrate_image = pygame.image.load('entities/supplycrate/supplycrate.png').convert_alpha()
+        self.supplycrate_image = resource_mgr.get_image('entities/supplycrate/supplycrate.png')
 
         GameEntity.__init__(self, game, "supplycrate", self.supplycrate_image, resource_mgr)
 
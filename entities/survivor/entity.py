@@ -16,9 +16,9 @@ class Survivor(GameEntity):
 
     def __init__(self, game, resource_mgr):
 
-        self.survivor_image = pygame.image.load("entities/survivor/survivor.png").convert_alpha()
-        self.survivor_dead_image = pygame.image.load("entities/survivor/survivor_dead.png").convert_alpha()
-        self.survivor_hit_image = pygame.image.load("entities/survivor/survivor_hit.png").convert_alpha()
+        self.survivor_image = resource_mgr.get_image("entities/survivor/survivor.png")
+        self.survivor_dead_image = resource_mgr.get_image("entities/survivor/survivor_dead.png")
+        self.survivor_hit_image = resource_mgr.get_image("entities/survivor/survivor_hit.png")
 
         GameEntity.__init__(self, game, "survivor", self.survivor_image, resource_mgr)
 
@@ -26,7 +26,7 @@ class Survivor(GameEntity):
 
         # Create an instance of each of the states
         exploring_state = states.SurvivorStateExploring(self)
-        attacking_state = states.SurvivorStateAttacking(self, self.resource_mgr)
+        attacking_state = states.SurvivorStateAttacking(self)
         evading_state = states.SurvivorStateEvading(self)
         seeking_state = states.SurvivorStateSeeking(self)
         dead_state = states.SurvivorStateDead(self, self.survivor_dead_image)
@@ -43,7 +43,11 @@ class Survivor(GameEntity):
         self.ammo = 10
         self.zombie_id = 0
 
-        self.evade_until = None
+        self.evade_timer = None  # While set, the survivor evades rather than attacking
+
+    def stop_evading(self):
+        """ Called when the evade_timer fires. """
+        self.evade_timer = None
 
     def bitten(self):
         """Damages the survivor and checks for death."""
@@ -53,13 +57,10 @@ class Survivor(GameEntity):
         if self.health <= 0:
             self.brain.set_state("dead")
 
-    def draw(self, surface):
-        """Handles drawing of the entity"""
-        # Call the draw function of the base class
-        GameEntity.draw(self, surface)
-
-        # Convert the "viewport" coordinates into "Device" coordinates for drawing
-        dev_location = self.game.scene.get_dev_vec_from_viewport_vec(self.location)
+    def draw_overlays(self, surface, sprite_rect):
+        """Handles drawing on top of the entity"""
+        # Call the draw_overlays function of the base class
+        GameEntity.draw_overlays(self, surface, sprite_rect)
 
         # Update survivor image to his alive image if they have recovered.
         if self.was_hit and self.health > 0:
@@ -67,25 +68,38 @@ class Survivor(GameEntity):
             self.was_hit = False
 
         if self.ammo < 1 and self.health > 0:
-            self._draw_caution_above_survivor(surface)
+            self.screen_rect = self._draw_caution_above_survivor(surface, sprite_rect).union(sprite_rect)
 
         # Debug drawing of target zombie line.
         if self.debug_mode:
+            dev_location = Vector2(sprite_rect.center)
+
             if self.zombie_id:
                 zombie = self.game.get(self.zombie_id)
                 if zombie is not None:
                     pygame.draw.line(surface, (25, 100, 255), dev_location, zombie.location)
 
             # blit ammo
-            surface.blit(self.resource_mgr.font.render(str(self.ammo), True, (0, 0, 0)), dev_location - Vector2(20, 0))
+            surface.blit(self.resource_mgr.render_text(str(self.ammo)), dev_location - Vector2(20, 0))
 
             # blit health
             surface.blit(
-                self.resource_mgr.font.render(str(self.health), True, (0, 0, 0)), dev_location - Vector2(5, 22)
+                self.resource_mgr.render_text(str(self.health)), dev_location - Vector2(5, 22)
             )
 
-    def _draw_caution_above_survivor(self, surface):
-        dev_location = self.game.scene.get_dev_vec_from_viewport_vec(self.location)
-
-        width, height = self.resource_mgr.caution_image.get_size()
-        surface.blit(self.resource_mgr.caution_image, (dev_location.x - width / 2, (dev_location.y - height / 2) - 10))
+    def get_screen_rect(self):
+        """ The survivor's rect, grown to cover the caution sign when shown. """
+        screen_rect = self.get_sprite_rect()
+        if self.ammo < 1 and self.health > 0:
+            screen_rect.union_ip(self._get_caution_rect(screen_rect))
+        return screen_rect
+
+    def _get_caution_rect(self, sprite_rect):
+        caution_rect = self.resource_mgr.caution_image.get_rect(center=sprite_rect.center)
+        caution_rect.y -= 10
+        return caution_rect
+
+    def _draw_caution_above_survivor(self, surface, sprite_rect):
+        caution_rect = self._get_caution_rect(sprite_rect)
+        surface.blit(self.resource_mgr.caution_image, caution_rect)
+        return caution_rect
@@ -1,10 +1,6 @@
-from random import randint
-from time import time
-
 from pygame.math import Vector2
 
 from entities.base_entity import State
-from entities.bullet.entity import Bullet
 
 
 class SurvivorStateExploring(State):
@@ -19,7 +15,7 @@ class SurvivorStateExploring(State):
 
     def do_actions(self):
         # Change direction occasionally
-        if randint(1, 200) == 1 or self.survivor.location == self.survivor.destination:
+        if self.survivor.game.random.randint(1, 200) == 1 or self.survivor.location == self.survivor.destination:
             self.survivor.destination = self.survivor.get_random_destination()
 
     def check_conditions(self):
@@ -49,18 +45,17 @@ class SurvivorStateAttacking(State):
     """ Once the survivor has a Zombie target, this state handles the
         targeting and shooting. """
 
-    def __init__(self, survivor, resource_mgr):
+    def __init__(self, survivor):
         # Call the base class constructor to init the State
         State.__init__(self, "attacking")
         # Set the survivor that this State will manipulate
         self.survivor = survivor
-        self.resource_mgr = resource_mgr
 
     def shoot_zombie(self):
         """ Acquires the zombie, spawns a bullet, and decrements the ammo """
         zombie = self.survivor.game.get(self.survivor.zombie_id)
         if zombie is not None:
-            bullet = Bullet(self.survivor.game, self.resource_mgr)
+            bullet = self.survivor.game.pools["bullet"].acquire()
             bullet.location = self.survivor.location
             bullet.zombie_id = zombie.id
             bullet.brain.set_state("seeking")
@@ -70,7 +65,7 @@ class SurvivorStateAttacking(State):
 
     def do_actions(self):
         # Occasionally take a shot at a zombie if ammo permits.
-        if self.survivor.ammo > 0 and randint(1, 30) == 1:
+        if self.survivor.ammo > 0 and self.survivor.game.random.randint(1, 30) == 1:
             self.shoot_zombie()
 
     def check_conditions(self):
@@ -89,8 +84,8 @@ class SurvivorStateAttacking(State):
 
         # Roughly after a second the survivor should stop shooting and
         # attempt to evade for 2 seconds
-        if randint(1, 50) == 1:
-            self.survivor.evade_until = time() + 2  # 2 seconds from now
+        if self.survivor.game.random.randint(1, 50) == 1:
+            self.survivor.evade_timer = self.survivor.game.schedule(2, self.survivor.stop_evading)  # 2 seconds from now
             return "evading"
 
         return None
@@ -111,7 +106,7 @@ class SurvivorStateEvading(State):
 
     def do_actions(self):
         # Occasionally make sure another zombie isn't closer.
-        if randint(1, 10) == 1:
+        if self.survivor.game.random.randint(1, 10) == 1:
             self.choose_new_evade_target()
 
     def choose_new_evade_target(self):
@@ -139,12 +134,12 @@ class SurvivorStateEvading(State):
             w_bound = self.survivor.game.scene.viewport_rect.right
             h_bound = self.survivor.game.scene.viewport_rect.bottom
 
-            x_point = abs(min([vec_away.x + randint(-20, 20), w_bound - 5]))
-            y_point = abs(min([vec_away.y + randint(-20, 20), h_bound - 5]))
+            x_point = abs(min([vec_away.x + self.survivor.game.random.randint(-20, 20), w_bound - 5]))
+            y_point = abs(min([vec_away.y + self.survivor.game.random.randint(-20, 20), h_bound - 5]))
             self.survivor.destination = Vector2(x_point, y_point)
 
     def check_conditions(self):
-        if self.survivor.evade_until is None:
+        if self.survivor.evade_timer is None:
             # Attack a near zombie if we have ammo.
             zombie = self.survivor.game.get_close_entity("zombie", self.survivor.location)
             if zombie is not None and self.survivor.ammo > 0:
@@ -154,9 +149,6 @@ class SurvivorStateEvading(State):
             if zombie is None:
                 self.survivor.zombie_id = None
                 return "exploring"
-        elif self.survivor.evade_until < time():
-            # evade_until timer elapsed, clear it
-            self.survivor.evade_until = None
 
         return None
 
@@ -220,7 +212,7 @@ class SurvivorStateDead(State):
         self.dead_image = dead_image
 
     def do_actions(self):
-        if randint(1, 10) == 1:
+        if self.survivor.game.random.randint(1, 10) == 1:
             self.survivor.health += 5
 
     def check_conditions(self):
@@ -1,5 +1,3 @@
-from random import randint
-
 import pygame
 from pygame.math import Vector2
 
@@ -13,7 +11,7 @@ class Zombie(GameEntity):
     BASE_SPEED = 1  # meters/second
 
     def __init__(self, game, resource_mgr):
-        self.zombie_image = pygame.image.load('entities/zombie/zombie.png').convert_alpha()
+        self.zombie_image = resource_mgr.get_image('entities/zombie/zombie.png')
 
         GameEntity.__init__(self, game, 'zombie', self.zombie_image, resource_mgr)
 
@@ -32,10 +30,10 @@ class Zombie(GameEntity):
         self.survivor_id = 0
         self.health = 3
 
-    def draw(self, surface):
-        """ draws the Zombie class and then any debug graphics  """
-        # Call the draw function of the base class
-        GameEntity.draw(self, surface)
+    def draw_overlays(self, surface, sprite_rect):
+        """ draws any debug graphics on top of the Zombie """
+        # Call the draw_overlays function of the base class
+        GameEntity.draw_overlays(self, surface, sprite_rect)
 
         # Debug drawing of target survivor line.
         if self.debug_mode:
@@ -45,6 +43,6 @@ class Zombie(GameEntity):
                     pygame.draw.line(surface, (255, 25, 25), self.location,
                                      survivor.location)
             # blit health
-            surface.blit(self.resource_mgr.font.render(str(self.health), True, (0, 0, 0)),
+            surface.blit(self.resource_mgr.render_text(str(self.health)),
                          self.location - Vector2(5, 22))
 
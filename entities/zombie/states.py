@@ -1,5 +1,3 @@
-from random import randint
-
 import pygame
 from pygame.math import Vector2
 
@@ -16,8 +14,9 @@ class ZombieStateWandering(State):
         self.zombie = zombie
 
     def do_actions(self):
-        # Change direction occasionally
-        if randint(1, 350) == 1 or self.zombie.location == self.zombie.destination:
+        # Change direction occasionally, just as often when thinking less often
+        if self.zombie.game.random.randint(1, 350) <= self.zombie.think_interval or \
+                self.zombie.location == self.zombie.destination:
             self.zombie.destination = self.zombie.get_random_destination()
 
     def check_conditions(self):
@@ -28,8 +27,7 @@ class ZombieStateWandering(State):
             return "feeding"
 
         # If there is a nearby survivor, switch to seeking state
-        survivor = self.zombie.game.get_close_entity("survivor",
-                                                      self.zombie.location)
+        survivor = self.zombie.game.get_closest_survivor(self.zombie.location)
         if survivor is not None:
             self.zombie.survivor_id = survivor.id
             return "seeking"
@@ -51,16 +49,14 @@ class ZombieStateSeeking(State):
 
     def do_actions(self):
         # Keep the closes survivor as the target.
-        survivor = self.zombie.game.get_closest_entity("survivor",
-                                                        self.zombie.location)
+        survivor = self.zombie.game.get_closest_survivor(self.zombie.location)
         if survivor is not None:
             self.zombie.survivor_id = survivor.id
             self.zombie.destination = survivor.location
 
     def check_conditions(self):
         # If no survivor in range, wander
-        survivor = self.zombie.game.get_closest_entity("survivor",
-                                                        self.zombie.location, 25)
+        survivor = self.zombie.game.get_closest_survivor(self.zombie.location, 25)
         if survivor is None:
             self.zombie.survivor_id = 0
             return "wandering"
@@ -68,7 +64,7 @@ class ZombieStateSeeking(State):
         # If the zombie is close enough to the survivor, attempt to kill it.
         if self.zombie.location.distance_to(survivor.location) <= 3.:
             # Give the survivor a fighting chance to avoid being killed!
-            if randint(1, 5) == 1:
+            if self.zombie.game.random.randint(1, 5) == 1:
                 survivor.bitten()
 
             # If the survivor is dead, start feeding.
@@ -0,0 +1,131 @@
+""" This module contains the FlowField class """
+
+from math import ceil, hypot
+
+import numpy as np
+from pygame.math import Vector2
+
+FLOW_FIELD_CELL_SIZE = 2.  # meters wide and tall
+FLOW_FIELD_MAX_CELLS = 128  # per axis, larger viewports get larger cells
+
+
+def neighbourhood(array, step, fill):
+    """ Returns a (9, rows, columns) array stacking, for every element of the
+        2d array, the element itself and the 8 around it step away, or fill
+        where those are off the edge. """
+    rows, columns = array.shape
+    padded = np.pad(array, step, constant_values=fill)
+    return np.stack([padded[step + dy:step + dy + rows, step + dx:step + dx + columns]
+                     for dx in (-step, 0, step) for dy in (-step, 0, step)])
+
+
+class FlowField(object):
+    """ A grid over the viewport holding, for each cell, the nearest entity
+        with a name (e.g. the nearest survivor).  Nothing blocks movement in
+        the game, so the gradient of the distance to those entities points
+        straight at the nearest one: following the field is heading for it.
+
+        The field is rebuilt the first time it is sampled after invalidate()
+        with a jump flooding pass over the whole grid, so its cost depends
+        on the size of the grid and not on how many entities sample it.
+
+        The field is approximate: it holds the nearest entity to each cell's
+        center, so the entity found from a location can be up to about a cell
+        diagonal further away than the nearest one. """
+
+    def __init__(self, game, name, cell_size=FLOW_FIELD_CELL_SIZE):
+        self.game = game
+        self.name = name  # of the entities the field leads to
+        self.cell_size = cell_size  # meters, before capping the cells per axis
+
+        self.stale = True  # the field must be rebuilt before it is sampled
+        self.sources = []  # the entities of that name, as of the last rebuild
+        self.source_locations = None  # their locations, one row per source
+        self.nearest = None  # (rows, columns) array of indexes into the sources, -1 if there are none
+        self.origin = 0., 0.  # viewport coordinates of the grid's top left corner
+        self.cell_width = self.cell_height = cell_size  # meters
+
+    def invalidate(self):
+        """ Marks the field as out of date, e.g. as a new tick starts. """
+        self.stale = True
+
+    def _rebuild(self):
+        self.stale = False
+
+        viewport_rect = self.game.scene.viewport_rect
+        columns = max(1, min(FLOW_FIELD_MAX_CELLS, int(ceil(viewport_rect.w / self.cell_size))))
+        rows = max(1, min(FLOW_FIELD_MAX_CELLS, int(ceil(viewport_rect.h / self.cell_size))))
+        self.origin = float(viewport_rect.left), float(viewport_rect.top)
+        self.cell_width = viewport_rect.w / columns
+        self.cell_height = viewport_rect.h / rows
+
+        self.sources = list(self.game.get_entities(self.name))
+        self.nearest = nearest = np.full((rows, columns), -1)
+        if not self.sources:
+            return
+
+        # Seed the cells holding a source with it.
+        self.source_locations = locations = self.game.kinematics.locations[[source.slot for source in self.sources]]
+        source_columns = np.clip(((locations[:, 0] - self.origin[0]) / self.cell_width).astype(int), 0, columns - 1)
+        source_rows = np.clip(((locations[:, 1] - self.origin[1]) / self.cell_height).astype(int), 0, rows - 1)
+        nearest[source_rows, source_columns] = np.arange(len(self.sources))
+
+        centers_x = self.origin[0] + (np.arange(columns) + .5) * self.cell_width
+        centers_y = self.origin[1] + (np.arange(rows) + .5) * self.cell_height
+
+        # Jump flooding: every cell adopts the nearest of its own source and
+        # those of the 8 cells step away, for halving steps, then once more
+        # at 1.  Each step is done for all cells and neighbours at once.
+        step = 1 << int(ceil(np.log2(max(rows, columns))))
+        steps = []
+        while step > 1:
+            step //= 2
+            steps.append(step)
+        steps.append(1)
+
+        # The source coordinates, with an infinitely far one at index -1 so
+        # that cells without a source are never the nearest.
+        sources_x = np.append(locations[:, 0], np.inf)
+        sources_y = np.append(locations[:, 1], np.inf)
+
+        for step in steps:
+            candidates = neighbourhood(nearest, step, -1)
+            vec_x = sources_x.take(candidates) - centers_x
+            vec_y = sources_y.take(candidates) - centers_y[:, None]
+            distances = vec_x * vec_x + vec_y * vec_y
+            nearest = np.take_along_axis(candidates, distances.argmin(axis=0)[None], axis=0)[0]
+        self.nearest = nearest
+
+    def closest(self, location: Vector2, radius):
+        """ Returns (distance, entity) for the entity the field leads to from
+            the location if it is within radius, or (None, None).  This is
+            the nearest entity or one close to it, not necessarily the
+            nearest. """
+        if self.stale:
+            self._rebuild()
+        if not self.sources:
+            return None, None
+
+        # The field holds the nearest source to each cell's center, so look
+        # at the cells around the location too and take the nearest of those.
+        rows, columns = self.nearest.shape
+        column = min(max(int((location.x - self.origin[0]) / self.cell_width), 0), columns - 1)
+        row = min(max(int((location.y - self.origin[1]) / self.cell_height), 0), rows - 1)
+        candidates = self.nearest[max(0, row - 1):row + 2, max(0, column - 1):column + 2].ravel().tolist()
+
+        x, y = location.x, location.y
+        locations = self.source_locations
+        distance, index = min((hypot(locations.item(index, 0) - x, locations.item(index, 1) - y), index)
+                              for index in set(candidates))
+        source = self.sources[index]
+
+        if self.game.get(source.id) is not source:
+            # Gone since the field was built, search for one instead.
+            closest_entity = self.game.get_closest_entity(self.name, location, radius)
+            if closest_entity is None:
+                return None, None
+            return location.distance_to(closest_entity.location), closest_entity
+
+        if distance >= radius:
+            return None, None
+        return distance, source
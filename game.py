@@ -1,37 +1,178 @@
 """ This module contains the Game class """
 
+from operator import itemgetter
+from random import Random
+
+from pygame import Rect, Surface
 from pygame.math import Vector2
 
+from entities.base_entity import GameEntity
+from entities.bloodsplat.entity import BloodSplat
+from entities.bullet.entity import Bullet
+from entities.entity_pool import EntityPool
 from entities.survivor.entity import Survivor
 from entities.supplycrate.entity import SupplyCrate
 from entities.zombie.entity import Zombie
+from flow_field import FlowField
+from kinematics import Kinematics
+from spatial_grid import SpatialGrid
+from think_scheduler import ThinkScheduler
+from timer_wheel import TimerWheel
+
+# Fraction of entities that may change in a frame before a dirty rect draw
+# gives up and redraws everything.
+DIRTY_RECTS_MAX_CHANGED = .25
+
+# Closest entity searches are done out to at least this radius (the largest
+# any state asks for) and cached, so smaller radii can be answered from them.
+QUERY_CACHE_RADIUS = 25.
+
+# Below this many zombie x survivor pairs, rebuilding the survivor flow field
+# each tick costs more than the searches it saves.
+FLOW_FIELD_MIN_PAIRS = 40000
+
+
+def state_key(entity):
+    """ Bucket key of the Game's state_grid: the entity's name and the name of
+        its active state. """
+    active_state = entity.brain.active_state
+    return entity.name, active_state.name if active_state is not None else None
 
 
 class Game(object):
 
-    def __init__(self, resource_mgr, scene):
+    def __init__(self, resource_mgr, scene, seed=None):
         self.resource_mgr = resource_mgr
         self.background = resource_mgr.background_image
+        self.background_surface = None  # The background tiled across the whole device
+        self.vacated_rects = []  # Device rects of entities removed since the last draw
+        self.full_redraw_needed = True  # Set when a dirty rect draw can't be trusted
         self.scene = scene
 
         self.entities = {}  # Store all the entities
+        self.entities_by_name = {}  # name -> {entity id: entity}
         self.next_entity_id = 0  # Next entity id assigned
+        self.kinematics = Kinematics()  # Location, destination and speed of the entities
+        self.interpolation = 1.  # How far between the last two ticks to draw the entities, 0 to 1
+        self.spatial_grid = SpatialGrid(self.kinematics)  # Index of the entities by location
+        self.state_grid = SpatialGrid(self.kinematics, key=state_key)  # Index by (name, state) and location
+        self.closest_cache = {}  # (x, y, name) -> (radius searched, distance, closest entity), until anything moves
+        self.survivor_field = FlowField(self, "survivor")  # Leads zombies to the nearest survivor, rebuilt each tick
+        self.think_scheduler = ThinkScheduler(self)  # Lets entities with nothing going on think less often
+
+        # While the entities tick, spawns and despawns are queued and only
+        # applied once every entity has ticked.
+        self.ticking = False
+        self.spawn_queue = {}  # entity id -> entity
+        self.despawn_queue = {}  # entity id -> entity
+
+        # Short-lived entities are recycled through pools, keyed by name.
+        self.pools = {
+            "bullet": EntityPool(Bullet, self, resource_mgr),
+            "bloodsplat": EntityPool(BloodSplat, self, resource_mgr),
+        }
 
         self.supply = 0.0
+        self.time = 0.  # seconds of game time simulated so far, the clock all states read
+        self.timers = TimerWheel()  # Callbacks due at a game time, see schedule()
+
+        # All randomness in the game comes from here, so a seed and the same
+        # inputs replay the same game.
+        self.random = Random(seed)
 
     def add_entity(self, entity):
-        """ Stores the entity then advances the current id """
-        self.entities[self.next_entity_id] = entity
+        """ Assigns the entity an id and stores it.  During a tick the entity
+            only joins the game once all entities have ticked. """
         entity.id = self.next_entity_id
         self.next_entity_id += 1
 
+        if self.ticking:
+            self.spawn_queue[entity.id] = entity
+        else:
+            self._insert_entity(entity)
+
     def remove_entity(self, entity):
-        """ Removes the entity from the game """
+        """ Removes the entity from the game.  During a tick the entity is
+            hidden from get() and the proximity queries straight away but only
+            leaves the game once all entities have ticked.  Removing it again
+            in the meantime is fine. """
+        if not self.ticking:
+            self._delete_entity(entity)
+        elif entity.id in self.spawn_queue:
+            # Never made it into the game.
+            del self.spawn_queue[entity.id]
+            self._release_to_pool(entity)
+        elif entity.id in self.entities and entity.id not in self.despawn_queue:
+            self.despawn_queue[entity.id] = entity
+            self.spatial_grid.remove(entity)
+            self.state_grid.remove(entity)
+            self.closest_cache = {}
+
+    def _apply_queued(self):
+        """ Applies the spawns and despawns queued during the tick. """
+        for entity in self.despawn_queue.values():
+            self._delete_entity(entity)
+        self.despawn_queue = {}
+
+        for entity in self.spawn_queue.values():
+            self._insert_entity(entity)
+        self.spawn_queue = {}
+
+    def _insert_entity(self, entity):
+        self.entities[entity.id] = entity
+        self.entities_by_name.setdefault(entity.name, {})[entity.id] = entity
+
+        # Hand the entity's locomotion over to the Kinematics arrays.
+        entity.slot = self.kinematics.allocate(entity, entity.location, entity.destination, entity.speed)
+        self.spatial_grid.insert(entity)
+        self.state_grid.insert(entity)
+        self.closest_cache = {}
+
+    def _delete_entity(self, entity):
         del self.entities[entity.id]
+        del self.entities_by_name[entity.name][entity.id]
+        self.spatial_grid.remove(entity)
+        self.state_grid.remove(entity)
+        self.closest_cache = {}
+
+        # Take the locomotion back so the entity is still usable once removed.
+        location, destination, speed = entity.location, entity.destination, entity.speed
+        self.kinematics.release(entity.slot)
+        entity.slot = None
+        entity.location, entity.destination, entity.speed = location, destination, speed
+
+        if entity.screen_rect is not None:
+            self.vacated_rects.append(entity.screen_rect)
+            entity.screen_rect = None
+
+        self._release_to_pool(entity)
+
+    def _release_to_pool(self, entity):
+        pool = self.pools.get(entity.name)
+        if pool is not None:
+            pool.release(entity)
+
+    def entity_moved(self, entity):
+        """ Re-indexes an entity whose location has changed. """
+        if entity.id in self.despawn_queue:
+            return
+        self.spatial_grid.update(entity)
+        self.state_grid.update(entity)
+        self.closest_cache = {}
+
+    def state_changed(self, entity):
+        """ Called by an entity's StateMachine whenever its state changes. """
+        if self.get(entity.id) is entity:
+            self.state_grid.update(entity)
+
+    def schedule(self, delay, callback, *args):
+        """ Calls callback(*args) once delay seconds of game time have passed,
+            at the start of a tick.  Returns a Timer that can be cancelled. """
+        return self.timers.schedule(self.time + delay, callback, *args)
 
     def get(self, id):
         """ Find the entity, given its id """
-        if id in self.entities:
+        if id in self.entities and id not in self.despawn_queue:
             return self.entities[id]
         else:
             return None
@@ -40,87 +181,212 @@ class Game(object):
         """ Call the tick method of each GameEntity """
         time_passed_seconds = time_passed / 1000.0
 
+        self.time += time_passed_seconds
         self.supply += time_passed_seconds / 2
 
-        local_entities = list(self.entities.values())
-        for entity in local_entities:
-            try:
-                entity.tick(time_passed_seconds)
-            except KeyError:
-                pass
+        self.kinematics.snapshot()
+        self.closest_cache = {}
+        self.survivor_field.invalidate()
+        resting = self.think_scheduler.resting_entities()
+
+        self.ticking = True
+        try:
+            self.timers.advance(self.time)
+            for entity in self.entities.values():
+                if entity.id not in self.despawn_queue and entity.id not in resting:
+                    entity.tick(time_passed_seconds)
+        finally:
+            self.ticking = False
+        self._apply_queued()
+
+        self._collide_entities(time_passed_seconds)
+        self._move_entities(time_passed_seconds)
+
+    def _collide_entities(self, time_passed_seconds):
+        """ Finds the blocking entity of every moving entity in one sweep, then
+            lets each of them react to it. """
+        moving = self.kinematics.moving_slots()
+        blockers = self.kinematics.find_blockers(moving, GameEntity.COLLISION_DISTANCE)
+
+        entities = self.kinematics.entities
+        for slot, blocker_slot in zip(moving.tolist(), blockers.tolist()):
+            blocking_entity = entities[blocker_slot] if blocker_slot >= 0 else None
+            entities[slot]._check_collisions_(time_passed_seconds, blocking_entity)
+
+    def _move_entities(self, time_passed_seconds):
+        """ Provides locomotion for every entity at once while ensuring they
+            stay within the viewport. """
+        moved_cells = self.kinematics.move(time_passed_seconds, self.scene.viewport_rect,
+                                           self.spatial_grid.cell_size)
+        for slot in moved_cells:
+            self.entity_moved(self.kinematics.entities[slot])
 
     def draw(self, surface):
         self._draw_background(surface)
-
+        self._draw_entities(surface, self.entities.values())
+
+        self.vacated_rects = []
+        self.full_redraw_needed = False
+
+    def draw_dirty(self, surface, extra_rects=()):
+        """ Redraws only what changed since the last draw.  The areas changed
+            entities cover (before and after), vacated areas and any extra
+            rects are restored from the background, then every entity touching
+            a restored area is drawn again, in the usual order.  Returns the
+            list of rects to update on the display. """
+        if self.full_redraw_needed or self._background_is_stale():
+            self.draw(surface)
+            return [self.scene.device_rect]
+
+        dirty_rects = self.vacated_rects + list(extra_rects)
+        self.vacated_rects = []
+
+        redraw = set()
+        unchanged = []
         for entity in self.entities.values():
-            entity.draw(surface)
+            if entity.needs_redraw():
+                redraw.add(entity)
+                if entity.screen_rect is not None:
+                    dirty_rects.append(entity.screen_rect)
+                dirty_rects.append(entity.get_screen_rect())
+            else:
+                unchanged.append(entity)
+
+        # Past a point, tracking the changes costs more than drawing everything.
+        if len(redraw) > len(self.entities) * DIRTY_RECTS_MAX_CHANGED:
+            self.draw(surface)
+            return [self.scene.device_rect]
+
+        # An entity touching a dirty area is redrawn whole, which dirties the
+        # rest of its rect too (drawing over itself would double up any
+        # translucency), so keep growing the dirty areas until they settle.
+        grew = True
+        while grew:
+            grew = False
+            still_unchanged = []
+            for entity in unchanged:
+                if entity.screen_rect.collidelist(dirty_rects) != -1:
+                    redraw.add(entity)
+                    dirty_rects.append(entity.screen_rect)
+                    grew = True
+                else:
+                    still_unchanged.append(entity)
+            unchanged = still_unchanged
+
+        for rect in dirty_rects:
+            surface.blit(self.background_surface, rect, rect)
+
+        self._draw_entities(surface, [entity for entity in self.entities.values() if entity in redraw])
+
+        return dirty_rects
+
+    def _draw_entities(self, surface, entities):
+        """ Draws the entities that are on the device, layer by layer, with a
+            single blits call, then draws their overlays. """
+        device_rect = self.scene.device_rect
+
+        # Convert every location to device coordinates in one go.
+        entities = list(entities)
+        slots = [entity.slot for entity in entities]
+        locations = self.kinematics.interpolated_locations(slots, self.interpolation)
+        dev_locations = self.scene.get_dev_array_from_viewport_array(locations).tolist()
+
+        visible = []
+        for entity, (dev_x, dev_y) in zip(entities, dev_locations):
+            width, height = entity.image.get_size()
+            sprite_rect = Rect(dev_x - width / 2, dev_y - height / 2, width, height)
+            if sprite_rect.colliderect(device_rect):
+                visible.append((entity.LAYER, entity, sprite_rect))
+
+        # The sort is stable, so entities keep their usual order within a layer.
+        visible.sort(key=itemgetter(0))
+        surface.blits([(entity.image, sprite_rect) for _, entity, sprite_rect in visible], False)
+
+        for _, entity, sprite_rect in visible:
+            entity.draw_overlays(surface, sprite_rect)
+
+    def _background_is_stale(self):
+        device_size = self.scene.device_rect.right, self.scene.device_rect.bottom
+        return self.background_surface is None or self.background_surface.get_size() != device_size
 
     def _draw_background(self, surface):
+        if self._background_is_stale():
+            device_size = self.scene.device_rect.right, self.scene.device_rect.bottom
+            self.background_surface = self._build_background(device_size)
+
+        surface.blit(self.background_surface, (0, 0))
+
+    def _build_background(self, device_size):
+        """ Tiles the background image across a surface of the device size. """
+        background_surface = Surface(device_size).convert()
         background_width, background_height = self.background.get_size()
 
         drawn_x = 0
-        while drawn_x < self.scene.device_rect.right:
-            
+        while drawn_x < device_size[0]:
+
             drawn_y = 0
-            while drawn_y < self.scene.device_rect.bottom:
-                surface.blit(self.background, (drawn_x, drawn_y))
+            while drawn_y < device_size[1]:
+                background_surface.blit(self.background, (drawn_x, drawn_y))
                 drawn_y += background_height
 
             drawn_x += background_width
-        
 
-    def get_close_entity(self, name, location: Vector2, radius=20., ignore_id=None):
-        """ Finds the first entity within range of a location """
+        return background_surface
 
-        for entity in self.entities.values():
-            # If an ignore_id is passed, ignore the entity with that id.
-            if ignore_id is not None and entity.id == ignore_id:
-                continue
-
-            if name is None or entity.name == name:
-                distance = location.distance_to(entity.location)
-                if distance < radius:
-                    return entity
-        return None
+    def get_close_entity(self, name, location: Vector2, radius=20.):
+        """ Finds an entity within range of a location: the closest one, as
+            that is cached anyway """
+        return self._get_cached_closest(name, location, radius)
 
     def get_closest_entity(self, name, location: Vector2, radius=20.):
         """ Find the closest entity within range of a location """
-
-        close_entities = []
-        for entity in self.entities.values():
-            if name is None or entity.name == name:
-                distance = location.distance_to(entity.location)
-                if distance < radius:
-                    close_entities.append((distance, entity))
-
-        # Return the closest of the entities within range.
-        if len(close_entities) > 0:
-            close_entities = sorted(close_entities, key=lambda e: e[0])
-            distance, closest_entity = close_entities[0]
-            return closest_entity
-
-        return None
+        return self._get_cached_closest(name, location, radius)
+
+    def get_closest_survivor(self, location: Vector2, radius=20.):
+        """ Find a survivor within range of a location, for zombies to chase.
+            Small games search for the closest one.  Once there are at least
+            FLOW_FIELD_MIN_PAIRS zombie x survivor pairs the survivor flow
+            field is sampled instead, which is approximate: see FlowField. """
+        if self.get_entity_count("zombie") * self.get_entity_count("survivor") < FLOW_FIELD_MIN_PAIRS:
+            return self.get_closest_entity("survivor", location, radius)
+
+        _, survivor = self.survivor_field.closest(location, radius)
+        return survivor
+
+    def _get_cached_closest(self, name, location: Vector2, radius):
+        """ Answers closest entity searches from the closest_cache where it
+            can.  The closest entity within the radius searched is also the
+            closest within any smaller radius it is within, and within any
+            larger radius at all, so a search is only repeated when it found
+            nothing and a larger radius is wanted. """
+        key = location.x, location.y, name
+        cached = self.closest_cache.get(key)
+        if cached is None or (cached[2] is None and radius > cached[0]):
+            search_radius = max(radius, QUERY_CACHE_RADIUS)
+            distance, closest_entity = self.spatial_grid.closest(name, location, search_radius)
+            cached = self.closest_cache[key] = search_radius, distance, closest_entity
+
+        _, distance, closest_entity = cached
+        if closest_entity is None or distance >= radius:
+            return None
+        return closest_entity
 
     def get_close_entity_in_state(self, name, states, location: Vector2, radius=20.):
         """ Find an entity within range of a location that is in one of the
             states provided. """
 
-        for entity in self.entities.values():
-            if entity.name == name:
-                for state in states:
-                    if entity.brain.active_state.name == state:
-                        distance = location.distance_to(entity.location)
-                        if distance < radius:
-                            return entity
+        for state in states:
+            for _, entity in self.state_grid.query((name, state), location, radius):
+                return entity
         return None
 
+    def get_entities(self, name):
+        """ Gets the entities in the game with that name. """
+        return self.entities_by_name.get(name, {}).values()
+
     def get_entity_count(self, name):
         """ Gets the number of entities in the game with that name. """
-        count = 0
-        for entity in self.entities.values():
-            if entity.name == name:
-                count += 1
-        return count
+        return len(self.entities_by_name.get(name, ()))
 
     def spawn_entity_at_device(self, entity_type, x_point, y_point):
         if self.supply - entity_type.SUPPLY_COST >= 0:
@@ -140,6 +406,9 @@ class Game(object):
         for entity in self.entities.values():
             entity.debug_mode = debug_mode
 
+        # Debug drawing extends past the entities' rects.
+        self.full_redraw_needed = True
+
     def turn_survivor(self, survivor):
         ''' Turns a survivor into a Zombie! '''
             
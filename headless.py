@@ -0,0 +1,33 @@
+""" Runs the simulation without a window and without a frame cap. """
+
+import os
+from time import perf_counter
+
+import pygame
+
+from scenes.game_scene import SIMULATION_TIME_STEP
+
+# Simulated milliseconds per tick, matching the windowed game's fixed step.
+DEFAULT_TIME_STEP = SIMULATION_TIME_STEP
+
+
+def init_headless_display():
+    """ Initialises pygame against SDL's dummy video driver.  A (tiny) display
+        surface is still created because images can only be converted once a
+        display mode has been set. """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    return pygame.display.set_mode((1, 1))
+
+
+def run_headless(scene, ticks, time_step=DEFAULT_TIME_STEP):
+    """ Ticks the scene as fast as possible with a fixed simulated time step.
+        Nothing is drawn.  Returns the achieved ticks per second. """
+    start = perf_counter()
+    for _ in range(ticks):
+        scene.tick(time_step)
+    elapsed = perf_counter() - start
+
+    if elapsed <= 0:
+        return float("inf")
+    return ticks / elapsed
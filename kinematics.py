@@ -0,0 +1,176 @@
+""" This module contains the Kinematics class """
+
+from math import sqrt
+
+import numpy as np
+from pygame.math import Vector2
+
+
+class Kinematics(object):
+    """ Holds the location, destination and speed of every entity in the game
+        in contiguous arrays so that all movement can be advanced in a single
+        vectorized step.  Each entity owns one slot (row) of the arrays. """
+
+    def __init__(self, capacity=256):
+        self.locations = np.zeros((capacity, 2))  # viewport coordinates
+        self.previous_locations = np.zeros((capacity, 2))  # locations as of the last snapshot
+        self.destinations = np.zeros((capacity, 2))  # viewport coordinates
+        self.speeds = np.zeros(capacity)  # meters/second
+        self.active = np.zeros(capacity, dtype=bool)  # slot is held by an entity
+
+        self.entities = [None] * capacity  # slot -> entity
+        self.free_slots = []  # released slots below the high-water mark
+        self.used = 0  # high-water mark of slots handed out
+
+    def _grow(self):
+        capacity = len(self.entities) * 2
+        for name in ("locations", "previous_locations", "destinations", "speeds", "active"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        self.entities.extend([None] * (capacity - len(self.entities)))
+
+    def allocate(self, entity, location: Vector2, destination: Vector2, speed):
+        """ Reserves a slot for the entity, seeds it with the values given
+            and returns the slot index. """
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            if self.used == len(self.entities):
+                self._grow()
+            slot = self.used
+            self.used += 1
+
+        self.locations[slot] = location
+        self.previous_locations[slot] = location
+        self.destinations[slot] = destination
+        self.speeds[slot] = speed
+        self.active[slot] = True
+        self.entities[slot] = entity
+        return slot
+
+    def release(self, slot):
+        """ Returns the slot to the free list.  A zero speed keeps it out of
+            the movement step until it is handed out again. """
+        self.speeds[slot] = 0.
+        self.active[slot] = False
+        self.entities[slot] = None
+        self.free_slots.append(slot)
+
+    def snapshot(self):
+        """ Remembers the current locations so that positions between this
+            and the next simulation step can be interpolated. """
+        self.previous_locations[:self.used] = self.locations[:self.used]
+
+    def interpolated_locations(self, slots, alpha):
+        """ Returns the locations of the slots given, alpha of the way from
+            their snapshot (0) to where they are now (1). """
+        if alpha >= 1.:
+            return self.locations[slots]
+        previous = self.previous_locations[slots]
+        return previous + (self.locations[slots] - previous) * alpha
+
+    def moving_slots(self):
+        """ Returns the slots that have a speed and are not yet at their
+            destination. """
+        vec_to_destination = self.destinations[:self.used] - self.locations[:self.used]
+        distance_to_destination = np.hypot(vec_to_destination[:, 0], vec_to_destination[:, 1])
+        return np.flatnonzero((self.speeds[:self.used] > 0) & (distance_to_destination > 0))
+
+    def find_blockers(self, slots, distance):
+        """ For each of the slots given, finds another held slot strictly
+            within distance of it.  Returns an array aligned with slots holding
+            the blocking slot, or -1 where nothing is that close.
+
+            All held slots are bucketed with one sort into square cells whose
+            diagonal is the distance, so any two slots sharing a cell block
+            each other.  Only slots alone in their cell are measured against
+            the cells around them, in a single vectorized sweep. """
+        blockers = np.full(len(slots), -1)
+        if len(slots) == 0:
+            return blockers
+
+        cell_size = distance / sqrt(2)
+        held = np.flatnonzero(self.active[:self.used])
+        held_cells = np.floor(self.locations[held] / cell_size).astype(int)
+
+        # Give every cell a single sortable key, with a margin so that the
+        # neighbouring cells of any slot also get valid keys.
+        origin = held_cells.min(axis=0) - 2
+        columns = held_cells[:, 1].max() - origin[1] + 3
+        held_keys = (held_cells[:, 0] - origin[0]) * columns + held_cells[:, 1] - origin[1]
+
+        order = np.argsort(held_keys, kind="stable")
+        held = held[order]
+        held_keys = held_keys[order]
+
+        # Where each slot ended up in the sorted order.
+        sorted_index = np.empty(self.used, dtype=int)
+        sorted_index[held] = np.arange(len(held))
+        slot_index = sorted_index[slots]
+
+        # Anything sharing the cell is close enough: take the next one in the
+        # cell, or failing that the previous one.
+        next_index = np.minimum(slot_index + 1, len(held) - 1)
+        prev_index = np.maximum(slot_index - 1, 0)
+        shares_next = (next_index != slot_index) & (held_keys[next_index] == held_keys[slot_index])
+        shares_prev = (prev_index != slot_index) & (held_keys[prev_index] == held_keys[slot_index])
+        blockers[shares_prev] = held[prev_index[shares_prev]]
+        blockers[shares_next] = held[next_index[shares_next]]
+
+        # The loners are measured against the 5x5 block of cells around them,
+        # expanded into one (slot, candidate) pair per held slot in that block.
+        loners = np.flatnonzero(~(shares_next | shares_prev))
+        if len(loners) == 0:
+            return blockers
+
+        neighbour_offsets = np.array([dx * columns + dy for dx in range(-2, 3) for dy in range(-2, 3)
+                                      if dx != 0 or dy != 0])
+        neighbour_keys = (held_keys[slot_index[loners]][:, None] + neighbour_offsets[None, :]).ravel()
+        range_starts = np.searchsorted(held_keys, neighbour_keys, side="left")
+        range_lengths = np.searchsorted(held_keys, neighbour_keys, side="right") - range_starts
+
+        pair_count = range_lengths.sum()
+        if pair_count == 0:
+            return blockers
+        pair_loners = np.repeat(np.repeat(loners, len(neighbour_offsets)), range_lengths)
+        range_offsets = np.cumsum(range_lengths) - range_lengths
+        pair_candidates = held[np.arange(pair_count) - np.repeat(range_offsets - range_starts, range_lengths)]
+
+        vec_to_candidates = self.locations[pair_candidates] - self.locations[slots[pair_loners]]
+        close = np.flatnonzero(np.hypot(vec_to_candidates[:, 0], vec_to_candidates[:, 1]) < distance)
+
+        # Pairs are ordered by loner, so the first close pair of each one wins.
+        blocked, first = np.unique(pair_loners[close], return_index=True)
+        blockers[blocked] = pair_candidates[close[first]]
+
+        return blockers
+
+    def move(self, time_passed, bounds, cell_size):
+        """ Advances every moving slot towards its destination by speed *
+            time_passed, then clamps the result inside bounds (a Rect whose
+            origin is 0, 0).  Returns the slots that moved into a different
+            cell of a grid with the cell_size given. """
+        locations = self.locations[:self.used]
+        destinations = self.destinations[:self.used]
+        speeds = self.speeds[:self.used]
+
+        vec_to_destination = destinations - locations
+        distance_to_destination = np.hypot(vec_to_destination[:, 0], vec_to_destination[:, 1])
+        moving = np.flatnonzero((speeds > 0) & (distance_to_destination > 0))
+        if len(moving) == 0:
+            return moving
+
+        old_locations = locations[moving]
+        distance = distance_to_destination[moving]
+        travel_distance = np.minimum(distance, time_passed * speeds[moving])
+        new_locations = old_locations + vec_to_destination[moving] * (travel_distance / distance)[:, None]
+
+        # Ensure the entities stay within the boundaries:
+        np.clip(new_locations, 0, (bounds.right, bounds.bottom), out=new_locations)
+        locations[moving] = new_locations
+
+        old_cells = np.floor(old_locations / cell_size)
+        new_cells = np.floor(new_locations / cell_size)
+        return moving[(old_cells != new_cells).any(axis=1)]
@@ -1,17 +1,21 @@
+import argparse
+
 import pygame
-from pygame.locals import QUIT, KEYDOWN, K_q, K_ESCAPE, K_BACKQUOTE, MOUSEBUTTONDOWN
+from pygame.locals import QUIT, KEYDOWN, K_q, K_ESCAPE, K_BACKQUOTE, K_f, K_p, MOUSEBUTTONDOWN
 
+from headless import DEFAULT_TIME_STEP, init_headless_display, run_headless
+from profiler import Profiler
 from resources.resourcemgr import ResourceMgr
 from scenes.game_scene import GameScene
 
 
-def main():
+def main(dirty_rects, fps, seed):
     pygame.init()
     SCREEN_SIZE = (1280, 800)
     surface = pygame.display.set_mode(SCREEN_SIZE, 0, 32)
     clock = pygame.time.Clock()
 
-    active_scene = GameScene(ResourceMgr())
+    active_scene = GameScene(ResourceMgr(), dirty_rects, seed)
     active_scene.generate_game()
 
     while True:
@@ -24,18 +28,69 @@ def main():
                     return
                 if event.key == K_BACKQUOTE:
                     active_scene.handle_tilde_key_down()
+                if event.key == K_f:
+                    active_scene.handle_fast_forward_key_down()
+                if event.key == K_p:
+                    active_scene.handle_profile_key_down()
             if event.type == MOUSEBUTTONDOWN:
                 if event.button == 1:
                     active_scene.handle_mouse_left_down(pygame.mouse.get_pos())
                 if event.button == 3:
                     active_scene.handle_mouse_right_down(pygame.mouse.get_pos())
 
-        time_passed = clock.tick(30)
+        # The simulation runs in fixed steps however fast frames are drawn.
+        time_passed = clock.tick(fps)
+
+        active_scene.advance(time_passed)
+        changed_rects = active_scene.draw(surface)
+
+        pygame.display.update(changed_rects)
+
+
+def main_headless(ticks, time_step, seed, profile_path):
+    """ Runs the game for a number of ticks without a window or frame cap,
+        writing a profile of the run to profile_path if one is given. """
+    init_headless_display()
+
+    active_scene = GameScene(ResourceMgr(), seed=seed)
+    active_scene.generate_game()
+
+    profiler = None
+    if profile_path is not None:
+        profiler = Profiler(window=ticks)
+        profiler.install()
+
+    ticks_per_second = run_headless(active_scene, ticks, time_step)
+
+    if profiler is not None:
+        profiler.uninstall()
+        profiler.end_tick()
+        profiler.dump(profile_path)
 
-        active_scene.tick(time_passed)
-        active_scene.draw(surface)
+    game = active_scene.game
+    print(f"{ticks} ticks at {time_step:.2f} ms: {ticks_per_second:.1f} ticks/sec")
+    print(f"Zombies: {game.get_entity_count('zombie')}  Survivors: {game.get_entity_count('survivor')}")
 
-        pygame.display.update()
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Outbreak Z")
+    parser.add_argument("--headless", action="store_true",
+                        help="run the simulation without a window, as fast as possible")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="only redraw and update the parts of the screen that changed")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="frame rate cap of the windowed game, independent of the simulation rate")
+    parser.add_argument("--ticks", type=int, default=1000,
+                        help="number of ticks to simulate in headless mode")
+    parser.add_argument("--time-step", type=float, default=DEFAULT_TIME_STEP,
+                        help="simulated milliseconds per tick in headless mode")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed the game so that it plays out the same way every time")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="profile the headless run and write the results to PATH")
+    args = parser.parse_args()
 
-main()
\ No newline at end of file
+    if args.headless:
+        main_headless(args.ticks, args.time_step, args.seed, args.profile)
+    else:
+        main(args.dirty_rects, args.fps, args.seed)
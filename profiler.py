@@ -0,0 +1,213 @@
+""" This module contains the Profiler class """
+
+import json
+from collections import deque
+from statistics import mean
+from time import perf_counter
+
+from entities.base_entity import GameEntity, State
+from game import Game
+
+# The methods timed, per State subclass, per entity name and for the Game.
+STATE_METHODS = ("do_actions", "check_conditions", "entry_actions", "exit_actions")
+ENTITY_METHODS = ("_check_collisions_", "draw_overlays")
+GAME_METHODS = ("_collide_entities", "_move_entities", "_draw_entities")
+
+# The Game's proximity queries, counted against the state issuing them.
+QUERY_METHODS = ("get_close_entity", "get_closest_entity", "get_close_entity_in_state", "get_closest_survivor")
+
+ROLLING_WINDOW = 300  # ticks the statistics are taken over
+
+
+def subclasses_of(cls):
+    """ Yields every subclass of the class, however indirect. """
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from subclasses_of(subclass)
+
+
+def percentile(ordered, fraction):
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Profiler(object):
+    """ Opt-in instrumentation of the game's behaviors.  Once installed it
+        wraps the State, GameEntity and Game methods above, adding up the
+        time spent in each and the proximity queries issued by each state
+        over a tick, and keeps those totals for the last window ticks.
+
+        Times are inclusive: a state's do_actions includes any other entity's
+        state change it causes.  The wrapping is done on the classes, so one
+        Profiler at a time profiles every game in the process. """
+
+    def __init__(self, window=ROLLING_WINDOW):
+        self.window = window
+        self.ticks = 0  # ticks profiled so far
+
+        self.timings = {}  # key -> deque of (seconds, calls) per tick
+        self.queries = {}  # state class name -> deque of queries per tick
+        self.current_timings = {}  # key -> [seconds, calls] this tick
+        self.current_queries = {}  # state class name -> queries this tick
+
+        self.running = set()  # keys being timed, so recursive calls aren't counted twice
+        self.state_stack = []  # class names of the states running, innermost last
+        self.querying = False  # a query is running, so the queries it makes aren't counted again
+        self.originals = []  # (class, method name, original function) to restore
+
+    # ############## INSTALLATION ############## #
+
+    def install(self):
+        """ Wraps the profiled methods of every class defining them. """
+        for state_type in subclasses_of(State):
+            for method in STATE_METHODS:
+                self._wrap(state_type, method, self._timed_state)
+
+        for entity_type in [GameEntity] + list(subclasses_of(GameEntity)):
+            for method in ENTITY_METHODS:
+                self._wrap(entity_type, method, self._timed_entity)
+
+        for method in GAME_METHODS:
+            self._wrap(Game, method, self._timed_game)
+        for method in QUERY_METHODS:
+            self._wrap(Game, method, self._counted_query)
+        self._wrap(Game, "tick", self._ticked)
+
+    def uninstall(self):
+        """ Restores the original methods. """
+        for owner, method, func in reversed(self.originals):
+            setattr(owner, method, func)
+        self.originals = []
+
+    def _wrap(self, owner, method, wrapper):
+        # Only methods the class defines itself, so that each is wrapped once.
+        func = owner.__dict__.get(method)
+        if func is not None:
+            self.originals.append((owner, method, func))
+            setattr(owner, method, wrapper(func, method))
+
+    def _timed(self, func, key_of):
+        profiler = self
+
+        def timed(owner, *args, **kwargs):
+            key = key_of(owner)
+            if key in profiler.running:
+                return func(owner, *args, **kwargs)
+
+            profiler.running.add(key)
+            start = perf_counter()
+            try:
+                return func(owner, *args, **kwargs)
+            finally:
+                profiler.running.discard(key)
+                totals = profiler.current_timings.setdefault(key, [0., 0])
+                totals[0] += perf_counter() - start
+                totals[1] += 1
+        return timed
+
+    def _timed_state(self, func, method):
+        timed = self._timed(func, lambda state: type(state).__name__ + "." + method)
+        state_stack = self.state_stack
+
+        def timed_state(state, *args, **kwargs):
+            state_stack.append(type(state).__name__)
+            try:
+                return timed(state, *args, **kwargs)
+            finally:
+                state_stack.pop()
+        return timed_state
+
+    def _timed_entity(self, func, method):
+        return self._timed(func, lambda entity: entity.name + "." + method)
+
+    def _timed_game(self, func, method):
+        return self._timed(func, lambda game: "game." + method)
+
+    def _counted_query(self, func, method):
+        profiler = self
+
+        def counted(game, *args, **kwargs):
+            if profiler.querying:
+                return func(game, *args, **kwargs)
+
+            state = profiler.state_stack[-1] if profiler.state_stack else "(no state)"
+            profiler.current_queries[state] = profiler.current_queries.get(state, 0) + 1
+            profiler.querying = True
+            try:
+                return func(game, *args, **kwargs)
+            finally:
+                profiler.querying = False
+        return counted
+
+    def _ticked(self, func, method):
+        profiler = self
+
+        def ticked(game, *args, **kwargs):
+            # A tick's sample also holds the drawing done since the last tick.
+            profiler.end_tick()
+            return func(game, *args, **kwargs)
+        return ticked
+
+    # ############## STATISTICS ############## #
+
+    def end_tick(self):
+        """ Files the totals of the current tick into the rolling window. """
+        if not self.current_timings and not self.current_queries and not self.timings:
+            return
+
+        for key in self.current_timings.keys() - self.timings.keys():
+            self.timings[key] = deque(maxlen=self.window)
+        for key, samples in self.timings.items():
+            samples.append(tuple(self.current_timings.get(key, (0., 0))))
+
+        for state in self.current_queries.keys() - self.queries.keys():
+            self.queries[state] = deque(maxlen=self.window)
+        for state, samples in self.queries.items():
+            samples.append(self.current_queries.get(state, 0))
+
+        self.current_timings = {}
+        self.current_queries = {}
+        self.ticks += 1
+
+    def report(self):
+        """ Per tick statistics over the rolling window: the timings, slowest
+            95th percentile first, and the queries, busiest first. """
+        timings = []
+        for key, samples in self.timings.items():
+            times = sorted(seconds for seconds, _ in samples)
+            timings.append({
+                "key": key,
+                "calls_per_tick": mean(calls for _, calls in samples),
+                "p50_ms": percentile(times, .5) * 1000,
+                "p95_ms": percentile(times, .95) * 1000,
+                "max_ms": times[-1] * 1000,
+            })
+        timings.sort(key=lambda row: row["p95_ms"], reverse=True)
+
+        queries = []
+        for state, samples in self.queries.items():
+            counts = sorted(samples)
+            queries.append({
+                "state": state,
+                "mean_per_tick": mean(counts),
+                "p95_per_tick": percentile(counts, .95),
+                "max_per_tick": counts[-1],
+            })
+        queries.sort(key=lambda row: row["mean_per_tick"], reverse=True)
+
+        return {"window": self.window, "ticks": self.ticks, "timings": timings, "queries": queries}
+
+    def overlay_lines(self, timings=8, queries=3):
+        """ Text lines summarising the slowest timings and busiest states. """
+        report = self.report()
+        lines = ["Profile of the last {} ticks (p50 / p95 ms)".format(min(self.ticks, self.window))]
+        for row in report["timings"][:timings]:
+            lines.append("{}: {:.2f} / {:.2f}".format(row["key"], row["p50_ms"], row["p95_ms"]))
+        for row in report["queries"][:queries]:
+            lines.append("{}: {:.0f} queries/tick".format(row["state"], row["mean_per_tick"]))
+        return lines
+
+    def dump(self, path):
+        """ Writes the report to a JSON file. """
+        with open(path, "w") as output:
+            json.dump(self.report(), output, indent=2)
@@ -1,7 +1,13 @@
 """ Sets up all resources used by outbreak_z """
 
+from collections import OrderedDict
+
 import pygame
 
+ROTATION_STEP = 10  # degrees between cached rotations
+ALPHA_STEP = 8  # alpha levels between cached transparencies
+TEXT_CACHE_SIZE = 1024  # rendered text surfaces kept before the least recently used is dropped
+
 
 class ResourceMgr(object):
     """ Contains all external resources used by the game. """
@@ -10,4 +16,50 @@ class ResourceMgr(object):
         self.font = pygame.font.SysFont("arial", 16)
 
         self.background_image = pygame.image.load('resources/background.jpg').convert()
-        self.caution_image = pygame.image.load('resources/caution.png').convert_alpha()
\ No newline at end of file
+        self.caution_image = pygame.image.load('resources/caution.png').convert_alpha()
+
+        self.images = {}  # Cache of converted images, keyed by path
+        self.transformed_images = {}  # Cache of rotated/faded images, keyed by (path, rotation, alpha)
+        self.text_images = OrderedDict()  # LRU cache of rendered text, keyed by (text, color)
+
+    def get_image(self, path):
+        """ Loads and converts the image on first use, then returns the same
+            surface to every caller.  The surface is shared, so callers that
+            need to modify it must work on a copy. """
+        image = self.images.get(path)
+        if image is None:
+            image = pygame.image.load(path).convert_alpha()
+            self.images[path] = image
+        return image
+
+    def get_transformed_image(self, path, rotation, alpha=255):
+        """ Returns the image rotated counterclockwise by rotation degrees and
+            with the surface alpha given, both rounded to the nearest cached
+            step.  Each combination is generated on first use and then shared,
+            so callers must not modify it. """
+        rotation = int(round(rotation / ROTATION_STEP)) * ROTATION_STEP % 360
+        alpha = max(0, min(255, int(round(alpha / ALPHA_STEP)) * ALPHA_STEP))
+
+        key = path, rotation, alpha
+        image = self.transformed_images.get(key)
+        if image is None:
+            image = pygame.transform.rotate(self.get_image(path), rotation)
+            image.set_alpha(alpha)
+            self.transformed_images[key] = image
+        return image
+
+    def render_text(self, text, color=(0, 0, 0)):
+        """ Renders antialiased text in the game font.  Recently rendered
+            (text, color) pairs are served from a least recently used cache,
+            so the surface is shared and must not be modified. """
+        key = text, color
+        image = self.text_images.get(key)
+        if image is not None:
+            self.text_images.move_to_end(key)
+            return image
+
+        image = self.font.render(text, True, color)
+        self.text_images[key] = image
+        if len(self.text_images) > TEXT_CACHE_SIZE:
+            self.text_images.popitem(last=False)
+        return image
@@ -1,3 +1,4 @@
+import numpy as np
 import pygame
 from pygame import Rect
 from pygame.math import Vector2
@@ -6,48 +7,62 @@ from pygame.math import Vector2
 class Scene():
     
     def __init__(self):
-        self.viewport_rect = Rect(0, 0, 1, 1)
-        self.device_rect = Rect(0, 0, 1, 1)
+        self._viewport_rect = Rect(0, 0, 1, 1)
+        self._device_rect = Rect(0, 0, 1, 1)
+        self._update_transform()
+
+    # The viewport <-> device transform is cached and only recalculated when
+    # one of the rects is assigned, so they must be replaced rather than
+    # modified in place.
+
+    @property
+    def viewport_rect(self) -> Rect:
+        return self._viewport_rect
+
+    @viewport_rect.setter
+    def viewport_rect(self, viewport_rect: Rect):
+        self._viewport_rect = Rect(viewport_rect)
+        self._update_transform()
+
+    @property
+    def device_rect(self) -> Rect:
+        return self._device_rect
+
+    @device_rect.setter
+    def device_rect(self, device_rect: Rect):
+        if device_rect != self._device_rect:
+            self._device_rect = Rect(device_rect)
+            self._update_transform()
+
+    def _update_transform(self):
+        """ Precomputes dev = viewport * scale + offset, per axis. """
+        self.dev_scale_x = self._device_rect.w / self._viewport_rect.w
+        self.dev_scale_y = self._device_rect.h / self._viewport_rect.h
+        self.dev_offset_x = self._device_rect.x - self._viewport_rect.x * self.dev_scale_x
+        self.dev_offset_y = self._device_rect.y - self._viewport_rect.y * self.dev_scale_y
+
+        self.dev_scale = np.array([self.dev_scale_x, self.dev_scale_y])
+        self.dev_offset = np.array([self.dev_offset_x, self.dev_offset_y])
 
     def get_viewport_x_from_dev_x(self, dev_x: float) -> float:
-        ratio = self.device_rect.w / self.viewport_rect.w
-        device_shift = dev_x - self.device_rect.x
-        viewport_shift = device_shift / ratio
-
-        return self.viewport_rect.x + viewport_shift
+        return (dev_x - self.dev_offset_x) / self.dev_scale_x
 
     def get_viewport_y_from_dev_y(self, dev_y: float) -> float:
-        ratio = self.device_rect.h / self.viewport_rect.h
-        device_shift = dev_y - self.device_rect.y
-        viewport_shift = device_shift / ratio
-
-        return self.viewport_rect.y + viewport_shift
+        return (dev_y - self.dev_offset_y) / self.dev_scale_y
 
     def get_dev_x_from_viewport_x(self, viewport_x: float) -> float:
-        ratio = self.viewport_rect.w / self.device_rect.w
-        viewport_shift = viewport_x - self.viewport_rect.x
-        dev_shift = viewport_shift / ratio
-
-        return self.device_rect.x + dev_shift
+        return viewport_x * self.dev_scale_x + self.dev_offset_x
 
     def get_dev_y_from_viewport_y(self, viewport_y: float) -> float:
-        ratio = self.viewport_rect.h / self.device_rect.h
-        viewport_shift = viewport_y - self.viewport_rect.y
-        dev_shift = viewport_shift / ratio
-
-        return self.device_rect.y + dev_shift
+        return viewport_y * self.dev_scale_y + self.dev_offset_y
 
     def get_dev_vec_from_viewport_points(self, viewport_x: float, viewport_y: float) -> Vector2:
-        dev_x = self.get_dev_x_from_viewport_x(viewport_x)
-        dev_y = self.get_dev_y_from_viewport_y(viewport_y)
-
-        return Vector2(dev_x, dev_y)
+        return Vector2(viewport_x * self.dev_scale_x + self.dev_offset_x,
+                       viewport_y * self.dev_scale_y + self.dev_offset_y)
 
     def get_viewport_vec_from_device_points(self, dev_x: float, dev_y: float) -> Vector2:
-        viewport_x = self.get_viewport_x_from_dev_x(dev_x)
-        viewport_y = self.get_viewport_y_from_dev_y(dev_y)
-
-        return Vector2(viewport_x, viewport_y)
+        return Vector2((dev_x - self.dev_offset_x) / self.dev_scale_x,
+                       (dev_y - self.dev_offset_y) / self.dev_scale_y)
 
     def get_dev_vec_from_viewport_vec(self, viewport_vec: Vector2) -> Vector2:
         return self.get_dev_vec_from_viewport_points(viewport_vec.x, viewport_vec.y)
@@ -55,3 +70,12 @@ class Scene():
     def get_viewport_vec_from_device_vec(self, dev_vec: Vector2) -> Vector2:
         return self.get_viewport_vec_from_device_points(dev_vec.x, dev_vec.y)
 
+    def get_dev_array_from_viewport_array(self, viewport_points: np.ndarray) -> np.ndarray:
+        """ Converts an (n, 2) array of viewport points to device points in
+            one vectorized step. """
+        return viewport_points * self.dev_scale + self.dev_offset
+
+    def get_viewport_array_from_dev_array(self, dev_points: np.ndarray) -> np.ndarray:
+        """ Converts an (n, 2) array of device points to viewport points in
+            one vectorized step. """
+        return (dev_points - self.dev_offset) / self.dev_scale
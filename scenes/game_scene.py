@@ -1,20 +1,36 @@
 """ This is the main game scene where the main game is played (instead of the Title or End Game scene for example).
 """
 
-from random import randint
+from time import perf_counter
 
 from pygame import Rect
 from pygame.math import Vector2
 from scenes.base_scene import Scene
 
 from game import Game
+from profiler import Profiler
 from entities.graveyard.entity import Graveyard
 from entities.survivor.entity import Survivor
 from entities.supplycrate.entity import SupplyCrate
 
+# Simulated milliseconds per simulation step, whatever the frame rate.
+SIMULATION_TIME_STEP = 1000. / 30
+
+# At most this many steps are run per frame, so that when frames are slow the
+# simulation falls behind real time instead of taking ever longer to catch up.
+MAX_STEPS_PER_FRAME = 5
+
+# The speeds the game can be played at, as multiples of real time.  None is
+# as fast as possible: each frame simulates for MAX_SPEED_FRAME_BUDGET.
+TIME_SCALES = (1, 4, 16, None)
+MAX_SPEED_FRAME_BUDGET = 1000. / 30  # milliseconds of real time
+
+# Where the profile is written when profiling is switched off.
+PROFILE_DUMP_PATH = "profile.json"
+
 
 class GameScene(Scene):
-    def __init__(self, resource_mgr):
+    def __init__(self, resource_mgr, dirty_rects=False, seed=None):
         super().__init__()
 
         # The viewport rect is the rectangle that represents the "viewport" into the real viewport.
@@ -24,29 +40,103 @@ class GameScene(Scene):
         # Inputs
         self.resource_mgr = resource_mgr
 
-        self.game = Game(resource_mgr, self)
+        self.game = Game(resource_mgr, self, seed)
         self.debugging = False
+        self.profiler = None  # A Profiler, while profiling
+        self.dirty_rects = dirty_rects  # Only redraw and update what changed each frame
+
+        self.time_step = SIMULATION_TIME_STEP  # milliseconds simulated per step
+        self.unsimulated_time = 0.  # milliseconds of frame time not yet simulated
+        self.time_scale = 1  # One of TIME_SCALES
 
-    def generate_game(self):
-        self.game.supply = 20
+    def generate_game(self, graveyards=4, supply=20, spawn_rate=Graveyard.SPAWN_RATE, survivors=0, supplycrates=0):
+        """ Populates the game.  The interactive game only starts with the
+            graveyards; batch runs also place survivors and supply crates. """
+        self.game.supply = supply
 
         # Spawn a few graveyards within the viewport
-        for _ in range(1, 5):
+        random = self.game.random
+        for _ in range(graveyards):
             graveyard = Graveyard(self.game, self.resource_mgr)
-            graveyard.location = Vector2(randint(0, self.viewport_rect.right), randint(0, self.viewport_rect.bottom))
+            graveyard.location = Vector2(random.randint(0, self.viewport_rect.right), random.randint(0, self.viewport_rect.bottom))
+            graveyard.spawn_rate = spawn_rate
             graveyard.brain.set_state("spawning")
             self.game.add_entity(graveyard)
 
+        for _ in range(survivors):
+            survivor = Survivor(self.game, self.resource_mgr)
+            survivor.location = Vector2(random.randint(0, self.viewport_rect.right), random.randint(0, self.viewport_rect.bottom))
+            survivor.brain.set_state("exploring")
+            self.game.add_entity(survivor)
+
+        for _ in range(supplycrates):
+            supplycrate = SupplyCrate(self.game, self.resource_mgr)
+            supplycrate.location = Vector2(random.randint(0, self.viewport_rect.right), random.randint(0, self.viewport_rect.bottom))
+            self.game.add_entity(supplycrate)
+
     def tick(self, time_passed):
         self.game.tick(time_passed)
 
+    def advance(self, time_passed):
+        """ Simulates the frame time passed in fixed steps of time_step,
+            carrying any remainder over to the next frame, and sets how far
+            between the last two steps the next draw should show the entities.
+            The frame time is first scaled by the time_scale.  Returns the
+            number of steps run. """
+        if self.time_scale is None:
+            return self._advance_max_speed()
+
+        max_unsimulated_time = MAX_STEPS_PER_FRAME * self.time_scale * self.time_step
+        self.unsimulated_time = min(self.unsimulated_time + time_passed * self.time_scale, max_unsimulated_time)
+
+        steps = 0
+        while self.unsimulated_time >= self.time_step:
+            self.tick(self.time_step)
+            self.unsimulated_time -= self.time_step
+            steps += 1
+
+        self.game.interpolation = self.unsimulated_time / self.time_step
+        return steps
+
+    def _advance_max_speed(self):
+        """ Runs steps until MAX_SPEED_FRAME_BUDGET of real time is used up. """
+        deadline = perf_counter() + MAX_SPEED_FRAME_BUDGET / 1000.
+
+        steps = 0
+        while steps == 0 or perf_counter() < deadline:
+            self.tick(self.time_step)
+            steps += 1
+
+        self.unsimulated_time = 0.
+        self.game.interpolation = 1.
+        return steps
+
+    def set_time_scale(self, time_scale):
+        """ Sets the speed of the game, one of TIME_SCALES. """
+        if time_scale not in TIME_SCALES:
+            raise ValueError("time_scale must be one of {}".format(TIME_SCALES))
+        self.time_scale = time_scale
+        self.unsimulated_time = 0.
+
     # ############## DRAWING ############## #
 
     def draw(self, surface):
+        """ Draws the scene and returns the list of rects that changed. """
         self.device_rect = surface.get_rect()
 
-        self.game.draw(surface)
+        # Debug drawing isn't tracked, so debugging always redraws everything.
+        if self.dirty_rects and not self.debugging:
+            changed_rects = self.game.draw_dirty(surface, [self._get_ui_rect()])
+        else:
+            self.game.draw(surface)
+            changed_rects = [self.device_rect]
+
         self._draw_ui(surface)
+        return changed_rects
+
+    def _get_ui_rect(self):
+        ''' The strip along the bottom of the device holding the UI text '''
+        return Rect(0, self.device_rect.bottom - 20, self.device_rect.w, 20)
 
     def _draw_ui(self, surface):
         ''' Draw UI elements onto the surface in device coordinates '''
@@ -54,17 +144,25 @@ class GameScene(Scene):
         h_bound = self.game.scene.device_rect.bottom
 
         zombies = "Zombies: " + str(self.game.get_entity_count("zombie"))
-        surface.blit(self.resource_mgr.font.render(zombies, True, (0, 0, 0)), Vector2(5, h_bound - 20))
+        surface.blit(self.resource_mgr.render_text(zombies), Vector2(5, h_bound - 20))
 
         survivors = "Survivors: " + str(self.game.get_entity_count("survivor"))
-        surface.blit(self.resource_mgr.font.render(survivors, True, (0, 0, 0)), Vector2(120, h_bound - 20))
+        surface.blit(self.resource_mgr.render_text(survivors), Vector2(120, h_bound - 20))
+
+        if self.time_scale != 1:
+            speed = "Speed: " + ("max" if self.time_scale is None else str(self.time_scale) + "x")
+            surface.blit(self.resource_mgr.render_text(speed), Vector2(260, h_bound - 20))
 
         res_str = "Supply Remaining: " + str(int(self.game.supply))
-        surface.blit(self.resource_mgr.font.render(res_str, True, (0, 0, 0)), Vector2(w_bound - 330, h_bound - 20))
+        surface.blit(self.resource_mgr.render_text(res_str), Vector2(w_bound - 330, h_bound - 20))
 
         if self.debugging:
             debug_text = 'Debugging'
-            surface.blit(self.resource_mgr.font.render(debug_text, True, (0, 0, 0)), (0, 0))
+            surface.blit(self.resource_mgr.render_text(debug_text), (0, 0))
+
+            if self.profiler is not None:
+                for line_number, line in enumerate(self.profiler.overlay_lines(), 1):
+                    surface.blit(self.resource_mgr.render_text(line), (0, line_number * 20))
 
     # ############ MOUSE INPUT MGMT ############### #
 
@@ -79,4 +177,20 @@ class GameScene(Scene):
     def handle_tilde_key_down(self):
         """ Tilde key indicates a toggling of the debug mode. """
         self.debugging = not self.debugging
-        self.game.set_debug_mode(self.debugging)
\ No newline at end of file
+        self.game.set_debug_mode(self.debugging)
+
+    def handle_profile_key_down(self):
+        """ The profile key switches profiling on, or off and dumps the profile
+            to PROFILE_DUMP_PATH.  The profile shows while debugging. """
+        if self.profiler is None:
+            self.profiler = Profiler()
+            self.profiler.install()
+        else:
+            self.profiler.uninstall()
+            self.profiler.dump(PROFILE_DUMP_PATH)
+            self.profiler = None
+
+    def handle_fast_forward_key_down(self):
+        """ The fast forward key steps through the TIME_SCALES. """
+        next_index = (TIME_SCALES.index(self.time_scale) + 1) % len(TIME_SCALES)
+        self.set_time_scale(TIME_SCALES[next_index])
\ No newline at end of file
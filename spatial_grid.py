@@ -0,0 +1,123 @@
+""" This module contains the SpatialGrid class """
+
+from math import floor, hypot
+
+import numpy as np
+from pygame.math import Vector2
+
+# Candidate counts below this are measured in plain Python.
+VECTORIZE_THRESHOLD = 32
+
+
+def name_key(entity):
+    """ The default bucket key of a SpatialGrid: the entity's name. """
+    return entity.name
+
+
+class SpatialGrid(object):
+    """ A uniform grid that buckets entities by location so that proximity
+        queries only need to look at the cells overlapping the search area. """
+
+    def __init__(self, kinematics, cell_size=20., key=name_key):
+        self.kinematics = kinematics  # Source of the entity locations
+        self.cell_size = cell_size  # meters wide and tall, sized to the usual query radius
+
+        # Entities are bucketed by key (e.g. name) first so that typed queries
+        # never have to step over entities of other types.
+        self.key = key  # function of the entity giving its bucket key
+        self.cells = {}  # key -> {(cell_x, cell_y) -> {kinematics slot: entity}}
+        self.entity_cells = {}  # entity id -> (key, (cell_x, cell_y))
+
+    def _cell_of(self, location: Vector2):
+        return int(floor(location.x / self.cell_size)), int(floor(location.y / self.cell_size))
+
+    def insert(self, entity):
+        """ Starts tracking the entity in the cell covering its location. """
+        key = self.key(entity)
+        cell = self._cell_of(entity.location)
+        self.cells.setdefault(key, {}).setdefault(cell, {})[entity.slot] = entity
+        self.entity_cells[entity.id] = key, cell
+
+    def remove(self, entity):
+        """ Stops tracking the entity. """
+        key_cell = self.entity_cells.pop(entity.id, None)
+        if key_cell is None:
+            return
+
+        key, cell = key_cell
+        key_cells = self.cells[key]
+        bucket = key_cells[cell]
+        del bucket[entity.slot]
+        if not bucket:
+            del key_cells[cell]
+
+    def update(self, entity):
+        """ Moves the entity into a new bucket if its location has changed
+            cells or its key has changed. """
+        key_cell = self.key(entity), self._cell_of(entity.location)
+        if self.entity_cells.get(entity.id) != key_cell:
+            self.remove(entity)
+            self.insert(entity)
+
+    def _candidates(self, key, location: Vector2, radius):
+        """ Returns two lists: the kinematics slots of every entity with that
+            key (or any key, if key is None) strictly within radius of the
+            location, and their distances. """
+        if key is None:
+            key_cells_list = list(self.cells.values())
+        elif key in self.cells:
+            key_cells_list = [self.cells[key]]
+        else:
+            return [], []
+
+        min_x, min_y = self._cell_of(location - Vector2(radius, radius))
+        max_x, max_y = self._cell_of(location + Vector2(radius, radius))
+
+        slots = []
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                for key_cells in key_cells_list:
+                    bucket = key_cells.get((cell_x, cell_y))
+                    if bucket is not None:
+                        slots.extend(bucket)
+
+        locations = self.kinematics.locations
+        if len(slots) < VECTORIZE_THRESHOLD:
+            # Too few candidates to be worth the fixed cost of numpy calls.
+            x, y = location.x, location.y
+            close_slots = []
+            close_distances = []
+            for slot in slots:
+                distance = hypot(locations.item(slot, 0) - x, locations.item(slot, 1) - y)
+                if distance < radius:
+                    close_slots.append(slot)
+                    close_distances.append(distance)
+            return close_slots, close_distances
+
+        # Measure every candidate in one go, straight from the Kinematics arrays.
+        slots = np.array(slots)
+        vec_to_candidates = locations[slots] - (location.x, location.y)
+        distances = np.hypot(vec_to_candidates[:, 0], vec_to_candidates[:, 1])
+
+        in_range = distances < radius
+        return slots[in_range].tolist(), distances[in_range].tolist()
+
+    def query(self, key, location: Vector2, radius):
+        """ Yields (distance, entity) for every entity with that key (or any
+            key, if key is None) strictly within radius of the location. """
+        slots, distances = self._candidates(key, location, radius)
+
+        entities = self.kinematics.entities
+        for slot, distance in zip(slots, distances):
+            yield distance, entities[slot]
+
+    def closest(self, key, location: Vector2, radius):
+        """ Returns (distance, entity) for the closest entity with that key
+            (or any key, if key is None) within radius of the location, or
+            (None, None) if there is none. """
+        slots, distances = self._candidates(key, location, radius)
+        if not slots:
+            return None, None
+
+        distance, slot = min(zip(distances, slots))
+        return distance, self.kinematics.entities[slot]
@@ -0,0 +1,58 @@
+""" This module contains the ThinkScheduler class """
+
+from math import ceil
+
+# The (name, state) of the entities that may think less often, and the name of
+# the entities whose proximity makes them think every tick again.
+LOD_STATES = {("zombie", "wandering"): "survivor"}
+
+LOD_RADIUS = 25.  # meters, beyond anything a wandering zombie reacts to
+LOD_THINK_INTERVAL = 4  # ticks between the thinks of a low-interest entity
+
+
+class ThinkScheduler(object):
+    """ Decides which entities think each tick.  Entities in one of the
+        LOD_STATES with nothing of interest within the radius only think every
+        think_interval ticks, staggered by id so that the work is spread over
+        the ticks.  Everything else thinks every tick.  Movement is not
+        affected, the Game moves every entity every tick.
+
+        Interest is judged a whole state_grid cell at a time: every entity in
+        a cell thinks every tick if an entity of interest is in any cell that
+        could be within the radius of it. """
+
+    def __init__(self, game, think_interval=LOD_THINK_INTERVAL, radius=LOD_RADIUS):
+        self.game = game
+        self.think_interval = think_interval
+        self.radius = radius  # meters
+        self.ticks = 0  # ticks scheduled so far
+
+    def resting_entities(self):
+        """ Returns the ids of the entities that skip thinking this tick.  Sets
+            the think_interval of every entity in one of the LOD_STATES, so
+            their states can make up for the ticks they skip. """
+        self.ticks += 1
+        resting = set()
+
+        reach = int(ceil(self.radius / self.game.state_grid.cell_size))  # cells
+        offsets = [(dx, dy) for dx in range(-reach, reach + 1) for dy in range(-reach, reach + 1)]
+
+        state_cells = self.game.state_grid.cells
+        for state_key, interest_name in LOD_STATES.items():
+            key_cells = state_cells.get(state_key)
+            if not key_cells:
+                continue
+            interest_cells = self.game.spatial_grid.cells.get(interest_name, {})  # same cells as the state_grid
+
+            for (cell_x, cell_y), bucket in key_cells.items():
+                if any((cell_x + dx, cell_y + dy) in interest_cells for dx, dy in offsets):
+                    for entity in bucket.values():
+                        entity.think_interval = 1
+                    continue
+
+                for entity in bucket.values():
+                    entity.think_interval = self.think_interval
+                    if (entity.id + self.ticks) % self.think_interval:
+                        resting.add(entity.id)
+
+        return resting
@@ -0,0 +1,60 @@
+""" This module contains the TimerWheel class """
+
+from math import floor
+
+
+class Timer(object):
+    """ A callback due at a game time, as returned by TimerWheel.schedule. """
+
+    def __init__(self, due, callback, args):
+        self.due = due  # game time, seconds
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        """ Stops the timer from firing, if it hasn't already. """
+        self.cancelled = True
+
+
+class TimerWheel(object):
+    """ A hashed timing wheel.  Timers are dropped into the bucket of the
+        wheel tick they are due in, so advancing the clock only looks at the
+        buckets of the ticks passed, whatever the number of timers pending.
+        Timers due more than a turn of the wheel away share a bucket with
+        nearer ones and wait for their turn. """
+
+    def __init__(self, resolution=.1, size=512):
+        self.resolution = resolution  # seconds per wheel tick
+        self.buckets = [[] for _ in range(size)]
+        self.current_tick = 0  # wheel tick of the last time advanced to
+
+    def schedule(self, due, callback, *args):
+        """ Calls callback(*args) once the wheel is advanced to the due time.
+            Returns the Timer, which can be cancelled. """
+        timer = Timer(due, callback, args)
+        tick = max(int(floor(due / self.resolution)), self.current_tick)
+        self.buckets[tick % len(self.buckets)].append(timer)
+        return timer
+
+    def advance(self, now):
+        """ Fires every timer due at or before now, wheel tick by wheel tick
+            and in the order they were scheduled within one.  Timers scheduled
+            by the callbacks for now or earlier fire on the next advance. """
+        last_tick = max(int(floor(now / self.resolution)), self.current_tick)
+        while True:
+            index = self.current_tick % len(self.buckets)
+            bucket = self.buckets[index]
+            self.buckets[index] = pending = []
+
+            for timer in bucket:
+                if timer.cancelled:
+                    continue
+                if timer.due <= now:
+                    timer.callback(*timer.args)
+                else:
+                    pending.append(timer)
+
+            if self.current_tick == last_tick:
+                return
+            self.current_tick += 1